@@ -43,6 +43,7 @@ __all__ = [
     'Adapter',
     'Aligned',
     'AlignedStruct',
+    'AsyncReaderIO',
     'Array',
     'Bit',
     'BitsInteger',
@@ -60,7 +61,9 @@ __all__ = [
     'CheckError',
     'Checksum',
     'ChecksumError',
+    'ChunkedBytesIO',
     'CipherError',
+    'clearCompileCache',
     'Compiled',
     'Compressed',
     'CompressedLZ4',
@@ -103,6 +106,7 @@ __all__ = [
     'HexDump',
     'If',
     'IfThenElse',
+    'IncrementalParser',
     'Index',
     'IndexFieldError',
     'Indexing',
@@ -122,7 +126,9 @@ __all__ = [
     'Mapping',
     'MappingError',
     'max_',
+    'MemoryviewIO',
     'min_',
+    'MmapIO',
     'NamedTuple',
     'NamedTupleError',
     'Nibble',
@@ -152,11 +158,15 @@ __all__ = [
     'Probe',
     'ProcessRotateLeft',
     'ProcessXor',
+    'Query',
+    'QueryIndex',
     'RangeError',
     'RawCopy',
     'Rebuffered',
     'RebufferedBytesIO',
     'Rebuild',
+    'Record',
+    'RecordStruct',
     'release_date',
     'Renamed',
     'RepeatError',
@@ -169,9 +179,11 @@ __all__ = [
     'Select',
     'SelectError',
     'Sequence',
+    'setGlobalCompileCache',
     'setGlobalPrintFalseFlags',
     'setGlobalPrintFullStrings',
     'setGlobalPrintPrivateEntries',
+    'setGlobalResultStreams',
     'Short',
     'Single',
     'SizeofError',
@@ -180,7 +192,10 @@ __all__ = [
     'StopIf',
     'stream_iseof',
     'stream_read',
+    'stream_read_async',
     'stream_read_entire',
+    'stream_read_entire_view',
+    'stream_read_view',
     'stream_seek',
     'stream_size',
     'stream_tell',
@@ -210,6 +225,7 @@ __all__ = [
     'VarInt',
     'version',
     'version_string',
+    'WindowIO',
     'ZigZag',
 ]
 __all__ += ["Int%s%s%s" % (n,us,bln) for n in (8,16,24,32,64) for us in "us" for bln in "bln"]
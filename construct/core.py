@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import struct, io, binascii, itertools, collections, pickle, sys, os, hashlib, importlib, importlib.machinery, importlib.util
+import struct, io, binascii, itertools, collections, pickle, sys, os, hashlib, mmap, marshal, types, weakref, importlib, importlib.machinery, importlib.util, ast, builtins, dis
 
 from construct.lib import *
 from construct.expr import *
@@ -187,6 +187,35 @@ def stream_read_entire(stream, path):
         raise StreamError("stream.read() failed when reading until EOF", path=path)
 
 
+def stream_read_view(stream, length, path):
+    if not isinstance(stream, MemoryviewIO) or not stream.zerocopy:
+        return stream_read(stream, length, path)
+    if length < 0:
+        raise StreamError("length must be non-negative, found %s" % length, path=path)
+    data = stream.readview(length)
+    if len(data) != length:
+        raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, len(data)), path=path)
+    return data
+
+
+async def stream_read_async(stream, length, path):
+    if length < 0:
+        raise StreamError("length must be non-negative, found %s" % length, path=path)
+    try:
+        return await stream.readexactly(length)
+    except EOFError as e:
+        # asyncio.IncompleteReadError
+        raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, len(getattr(e, "partial", b""))), path=path)
+    except Exception:
+        raise StreamError("stream.readexactly() failed, requested %s bytes" % (length,), path=path)
+
+
+def stream_read_entire_view(stream, path):
+    if not isinstance(stream, MemoryviewIO) or not stream.zerocopy:
+        return stream_read_entire(stream, path)
+    return stream.readview()
+
+
 def stream_write(stream, data, length, path):
     if not isinstance(data, bytes):
         raise StringError("given non-bytes value, perhaps unicode? %r" % (data,), path=path)
@@ -240,6 +269,30 @@ class BytesIOWithOffsets(io.BytesIO):
     @staticmethod
     def from_reading(stream, length: int, path: str):
         offset = stream_tell(stream, path)
+        if isinstance(stream, MemoryviewIO):
+            if length < 0:
+                raise StreamError("length must be non-negative, found %s" % length, path=path)
+            data = stream.readview(length)
+            if len(data) != length:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, len(data)), path=path)
+            return stream.__class__(data, stream, offset)
+        if type(stream) is _ParsingBytesIO:
+            # the stream parse() made is sliced instead of copied, so nested substreams do not copy the payload at every level
+            if length < 0:
+                raise StreamError("length must be non-negative, found %s" % length, path=path)
+            data = stream.view()[offset:offset+length]
+            if len(data) != length:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, len(data)), path=path)
+            stream_seek(stream, length, io.SEEK_CUR, path)
+            return _BytesIOView(data, stream, offset)
+        if isinstance(stream, (MmapIO, WindowIO)):
+            if length < 0:
+                raise StreamError("length must be non-negative, found %s" % length, path=path)
+            end = len(stream) if isinstance(stream, MmapIO) else stream.parent_stream_offset + stream.length
+            if offset + length > end:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, max(end - offset, 0)), path=path)
+            stream_seek(stream, length, io.SEEK_CUR, path)
+            return WindowIO(stream, offset, length)
         contents = stream_read(stream, length, path)
         return BytesIOWithOffsets(contents, stream, offset)
 
@@ -259,21 +312,576 @@ class BytesIOWithOffsets(io.BytesIO):
         return self.tell()
 
 
-class CodeGen:
+class MemoryviewIO(object):
+    r"""
+    Stream over an in-memory buffer (bytes bytearray memoryview mmap array etc), that never copies the buffer itself. Regular `read` returns bytes and copies only the requested amount, while `readview` returns memoryview slices of the original buffer without copying anything.
+
+    The stream is writable if the buffer is writable, but it cannot grow: writing past the end of the buffer fails. Building into it is what :meth:`~construct.core.Construct.build_into` does, and FormatField packs straight into the buffer.
+
+    Parsing from this stream is the zero-copy mode: :class:`~construct.core.Bytes` and :class:`~construct.core.GreedyBytes` parse into memoryview slices, and substreams created by :class:`~construct.core.Prefixed` :class:`~construct.core.FixedSized` :class:`~construct.core.OffsettedEnd` are slices too. Other fields parse into their usual values. Note that returned slices keep the original buffer alive.
+
+    Like BytesIOWithOffsets, tell and seek use offsets of the parent stream, if one is given.
+
+    :param buffer: any object supporting the buffer protocol
+    :param parent_stream: optional, stream this buffer was read from
+    :param offset: integer, offset of this buffer within parent stream
+
+    Example::
+
+        >>> d = Struct("length" / Int8ub, "data" / Bytes(this.length))
+        >>> obj = d.parse_stream(MemoryviewIO(b"\x04beef"))
+        >>> obj.data
+        <memory at 0x...>
+        >>> obj.data == b"beef"
+        True
+    """
+
+    # whether Bytes and GreedyBytes parse into slices
+    zerocopy = True
+    # whether seeking past the written bytes zeroes the gap, like writing past the end of BytesIO does
+    zerofill = False
+
+    def __init__(self, buffer, parent_stream=None, offset=0):
+        view = memoryview(buffer)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        self.buffer = view
+        self.position = 0
+        # furthest position that seeking moved away from, so build_into knows how much got written
+        self.highwater = 0
+        self.parent_stream = parent_stream
+        self.parent_stream_offset = offset
+
+    def readview(self, count=None):
+        start = self.position
+        if count is None or count < 0:
+            data = self.buffer[start:]
+        else:
+            data = self.buffer[start:start+count]
+        self.position = start + len(data)
+        return data
+
+    def read(self, count=None):
+        return self.readview(count).tobytes()
+
+    def tell(self):
+        return self.position + self.parent_stream_offset
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset - self.parent_stream_offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = len(self.buffer) + offset
+        else:
+            raise ValueError("invalid whence (%r, should be 0, 1 or 2)" % (whence,))
+        if position < 0:
+            raise ValueError("negative seek value %d" % (position,))
+        if self.position > self.highwater:
+            self.highwater = self.position
+        if self.zerofill and position > self.highwater:
+            end = min(position, len(self.buffer))
+            if end > self.highwater:
+                self.buffer[self.highwater:end] = bytes(end - self.highwater)
+        self.position = position
+        return self.tell()
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return not self.buffer.readonly
+
+    def write(self, data):
+        if self.buffer.readonly:
+            raise io.UnsupportedOperation("MemoryviewIO buffer is read-only")
+        start = self.position
+        end = start + len(data)
+        if end > len(self.buffer):
+            raise ValueError("cannot write %d bytes at %d, buffer has only %d bytes" % (len(data), start, len(self.buffer)))
+        self.buffer[start:end] = data
+        self.position = end
+        return len(data)
+
+
+class _ParsingBytesIO(io.BytesIO):
+    """Used internally. Stream that parse() reads from. Nobody else can write to it, so substreams can be slices of the parsed data. Bytes are sliced directly, because getbuffer() would make the BytesIO copy the bytes it shares. Other data was already copied into the BytesIO, so its own buffer is sliced."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.data = memoryview(data) if type(data) is bytes else None
+
+    def view(self):
+        if self.data is None:
+            self.data = self.getbuffer().toreadonly()
+        return self.data
+
+
+class _BytesIOView(MemoryviewIO):
+    """Used internally. Substream of a _ParsingBytesIO, that is a slice of its buffer. Unlike MemoryviewIO, parsing from it returns bytes like parsing from the BytesIO would."""
+    zerocopy = False
+
+
+class MmapIO(mmap.mmap):
+    r"""
+    Memory-mapped file stream. Reads are served straight from the page cache, so constructs that seek around (Pointer Peek Lazy Union RawCopy etc) do not cost a syscall each. Unlike plain mmap objects, seek returns the new position like regular files do.
+
+    It is used automatically by parse_file() for regular files. Streams passed to parse_stream() can opt in by wrapping them with `MmapIO.from_file(f)`.
+
+    Example::
+
+        >>> with open("dump.bin", "rb") as f:
+        ...     obj = d.parse_stream(MmapIO.from_file(f))
+    """
+
+    @staticmethod
+    def from_file(f):
+        stream = MmapIO(f.fileno(), 0, access=mmap.ACCESS_READ)
+        stream.seek(f.tell())
+        return stream
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        super().seek(offset, whence)
+        return self.tell()
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+
+class WindowIO(object):
+    r"""
+    Read-only bounded window onto a range of a seekable parent stream, that does not copy the range. Reads are served from the parent on demand and never go past the end of the window. Windows onto windows are flattened onto the outermost parent, so nesting does not add any overhead.
+
+    Like BytesIOWithOffsets, tell and seek use offsets of the parent stream. Reading does not move the parent stream.
+
+    Substreams created by :class:`~construct.core.Prefixed` :class:`~construct.core.FixedSized` :class:`~construct.core.OffsettedEnd` are windows when parsing memory-mapped files (see :class:`~construct.core.MmapIO`), and windows can also be used directly to parse a region of a larger stream.
+
+    :param parent_stream: seekable and readable stream
+    :param offset: integer, offset of the window within parent stream
+    :param length: integer, size of the window
+
+    Example::
+
+        >>> with open("dump.bin", "rb") as f:
+        ...     obj = d.parse_stream(WindowIO(f, 0x1000, 0x200))
+    """
+
+    def __init__(self, parent_stream, offset, length):
+        if isinstance(parent_stream, WindowIO):
+            if offset < parent_stream.parent_stream_offset or offset + length > parent_stream.parent_stream_offset + parent_stream.length:
+                raise ValueError("window [%d, %d) does not fit in parent window" % (offset, offset + length))
+            parent_stream = parent_stream.parent_stream
+        self.parent_stream = parent_stream
+        self.parent_stream_offset = offset
+        self.length = length
+        self.position = 0
+
+    def read(self, count=None):
+        start = self.position
+        stop = self.length if count is None or count < 0 else min(start + count, self.length)
+        if stop <= start:
+            return b""
+        parent = self.parent_stream
+        offset = self.parent_stream_offset
+        if isinstance(parent, mmap.mmap):
+            data = parent[offset+start:offset+stop]
+        else:
+            fallback = parent.tell()
+            parent.seek(offset + start)
+            data = parent.read(stop - start)
+            parent.seek(fallback)
+        self.position = start + len(data)
+        return data
+
+    def tell(self):
+        return self.position + self.parent_stream_offset
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset - self.parent_stream_offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.length + offset
+        else:
+            raise ValueError("invalid whence (%r, should be 0, 1 or 2)" % (whence,))
+        if position < 0:
+            raise ValueError("negative seek value %d" % (position,))
+        self.position = position
+        return self.tell()
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def write(self, data):
+        raise io.UnsupportedOperation("WindowIO is read-only")
+
+
+class ChunkedBytesIO(object):
+    r"""
+    Stream for building, that keeps written bytes objects as a list of chunks instead of copying them into a single buffer. Prefixed and FixedSized splice the chunks built by their subcon into this stream, and Tunnel Transformed ProcessXor append their encoded data, so nested builds do not copy the same bytes at every level. The chunks can be joined once, or passed to `os.writev` or `socket.sendmsg` as they are.
+
+    Writing anywhere but at the end (after seeking back, like Pointer does) and reading (like RawCopy does) first joins all chunks into one. Chunks are always non-empty bytes objects, empty writes are skipped.
+
+    Example::
+
+        >>> stream = ChunkedBytesIO()
+        >>> Prefixed(Byte, GreedyBytes).build_stream(b"data", stream)
+        >>> stream.chunks
+        [b'\x04', b'data']
+    """
+
     def __init__(self):
+        self.chunks = []
+        self.length = 0
+        self.position = 0
+
+    def __len__(self):
+        return self.length
+
+    def _flatten(self):
+        if len(self.chunks) > 1:
+            self.chunks = [b"".join(self.chunks)]
+        return self.chunks[0] if self.chunks else b""
+
+    def write(self, data):
+        count = len(data)
+        if not count:
+            return 0
+        if self.position == self.length:
+            self.chunks.append(data if type(data) is bytes else bytes(data))
+            self.length += count
+        else:
+            buffer = bytearray(self._flatten())
+            if self.position > self.length:
+                buffer += bytes(self.position - self.length)
+            buffer[self.position:self.position+count] = data
+            self.chunks = [bytes(buffer)]
+            self.length = len(buffer)
+        self.position += count
+        return count
+
+    def extend(self, other):
+        """Splices chunks of another ChunkedBytesIO at current position, without copying them."""
+        if self.position == self.length:
+            self.chunks.extend(other.chunks)
+            self.length += other.length
+            self.position = self.length
+        else:
+            self.write(other.getvalue())
+
+    def read(self, count=None):
+        buffer = self._flatten()
+        start = self.position
+        if count is None or count < 0:
+            data = buffer[start:]
+        else:
+            data = buffer[start:start+count]
+        self.position = start + len(data)
+        return data
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.length + offset
+        else:
+            raise ValueError("invalid whence (%r, should be 0, 1 or 2)" % (whence,))
+        if position < 0:
+            raise ValueError("negative seek value %d" % (position,))
+        self.position = position
+        return position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+
+class AsyncReaderIO(object):
+    """Used internally. Wraps an asyncio.StreamReader and counts bytes read from it, so that stream offsets are known."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.offset = 0
+
+    async def readexactly(self, count):
+        data = await self.reader.readexactly(count)
+        self.offset += len(data)
+        return data
+
+    async def read(self, count=-1):
+        data = await self.reader.read(count)
+        self.offset += len(data)
+        return data
+
+    def tell(self):
+        return self.offset
+
+
+class LRUCache(object):
+    """Used internally. Mapping that keeps at most maxsize most recently used entries, nothing if maxsize is 0."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, key):
+        value = self.entries[key]
+        self.entries.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.resize(self.maxsize)
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self.entries) > maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# process-wide, compile() entries by fingerprint of entire construct tree
+compiledcache = LRUCache(128)
+# process-wide, compiled functions of pure subtrees by their digest, these keep the namespace of the module they were compiled in alive
+sharedparsercache = LRUCache(1024)
+sharedbuildercache = LRUCache(1024)
+
+
+def setGlobalCompileCache(maxsize=128):
+    r"""
+    Sets how many compiled constructs are memoised within the process (see :meth:`~construct.core.Construct.compile`), and drops the least recently used ones above that. Functions of equal subtrees, that compiled constructs share, are kept for up to eight times as many. Memoised entries keep the generated modules they came from (and constructs and lambdas these link to) alive, so processes that compile many short-lived schemas can lower this, or disable memoisation with 0. The on-disk cache (cachedir) is not affected.
+
+    :param maxsize: integer, 0 or more
+    """
+    compiledcache.resize(maxsize)
+    sharedparsercache.resize(maxsize * 8)
+    sharedbuildercache.resize(maxsize * 8)
+
+
+def clearCompileCache():
+    r"""
+    Forgets all compiled constructs memoised within the process, see :func:`~construct.core.setGlobalCompileCache`. The on-disk cache (cachedir) is not affected.
+    """
+    compiledcache.clear()
+    sharedparsercache.clear()
+    sharedbuildercache.clear()
+
+
+class CodeGen:
+    def __init__(self, fingerprints=None, shared=False, hybrid=False):
         self.blocks = []
         self.nextid = 0
         self.parsercache = {}
         self.buildercache = {}
+        self.sizeofcache = {}
         self.linkedinstances = {}
         self.linkedparsers = {}
         self.linkedbuilders = {}
+        self.linkedsizeofs = {}
         self.userfunction = {}
+        self.fingerprints = fingerprints or {}
+        self.shared = shared
+        self.sharedparsers = {}
+        self.sharedbuilders = {}
+        self.shareableparsers = {}
+        self.shareablebuilders = {}
+        self.hybrid = hybrid
+        self.path = ["(compiling)"]
+        self.report = []
+        self.boundparsers = {}
+        self.boundbuilders = {}
+        self.globalnames = set(dir(builtins))
+        self.globalblocks = 0
 
     def allocateId(self):
         self.nextid += 1
         return self.nextid
 
+    def definedFunctions(self, since):
+        """Whether blocks appended since given count define functions. Only such subtrees are worth sharing, smaller ones are cheaper inlined."""
+        return any(block.startswith("def ") for block in self.blocks[since:])
+
+    def nodeKey(self, sc):
+        """Pure subtrees are keyed by their structure, so equal subtrees compile once, others are keyed by identity."""
+        fingerprint = self.fingerprints.get(id(sc))
+        if fingerprint is not None and fingerprint[1]:
+            return fingerprint[0]
+        return id(sc)
+
+    def contextReads(self, *items):
+        """Keys of the context that compiled parsers of given constructs and given parameters read, or None if any can read anything. Linked constructs can read anything."""
+        reads = set()
+        for item in items:
+            if isinstance(item, Construct):
+                found = None if id(item) in self.linkedinstances else item._emitreads(self)
+            else:
+                found = contextreads(item)
+            if found is None:
+                return None
+            reads |= found
+        return reads
+
+    def lazySize(self, sc):
+        """Expression on io and this, that returns how many bytes a construct takes without parsing it, like _actualsize does."""
+        if getattr(sc._actualsize, "__func__", None) is Construct._actualsize:
+            return sc._compilesizeof(self)
+        sc._compileinstance(self)
+        return f"linkedinstances[{id(sc)}]._actualsize(io, this, '(parsing)')"
+
+    def fixedRuns(self, subcons):
+        """Groups consecutive fixed-size fields, so that each run of them is read and unpacked at once. Returns a list of (unpack, fields) pairs. Fields that cannot be fused come one at a time with unpack being None. Otherwise unpack is an expression that unpacks the whole run, and fields are (subcon, value) pairs, value being an expression on the unpacked tuple named fused."""
+        runs = []
+        run = None
+        for sc in subcons:
+            try:
+                order, fmt, value = sc._emitfixedparse(self)
+            except NotImplementedError:
+                run = None
+                runs.append((None, [sc]))
+                continue
+            if run is None or None not in (order, run["order"]) and order != run["order"]:
+                run = dict(order=order, fields=[])
+                runs.append((run, run["fields"]))
+            run["order"] = run["order"] or order
+            run["fields"].append((sc, fmt, value))
+        result = []
+        for run, fields in runs:
+            if run is None:
+                result.append((None, fields))
+            elif len(fields) == 1:
+                result.append((None, [fields[0][0]]))
+            else:
+                fmtstr = (run["order"] or "<") + "".join(fmt for sc,fmt,value in fields)
+                fname = f"fixedrun_{self.allocateId()}"
+                self.append(f"{fname} = struct.Struct({repr(fmtstr)})")
+                values = []
+                index = 0
+                for sc, fmt, value in fields:
+                    if value is None:
+                        values.append((sc, "None"))
+                    else:
+                        values.append((sc, value(f"fused[{index}]")))
+                        index += 1
+                result.append((f"{fname}.unpack(io.read({struct.calcsize(fmtstr)}))", values))
+        return result
+
+    def fallback(self, kind, sc, error):
+        """Records that a construct is linked instead of compiled, and why."""
+        reason = "%s: %s" % (type(error).__name__, error) if str(error) else type(error).__name__
+        self.report.append((" -> ".join(self.path), kind, type(extractfield(sc)).__name__, reason))
+
+    def definedNames(self):
+        """Returns names that appended blocks define or import at module level, and builtins."""
+        names = self.globalnames
+        for block in self.blocks[self.globalblocks:]:
+            try:
+                statements = ast.parse(block).body
+            except SyntaxError:
+                continue
+            for statement in statements:
+                if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    names.add(statement.name)
+                elif isinstance(statement, ast.Assign):
+                    names.update(node.id for target in statement.targets for node in ast.walk(target) if isinstance(node, ast.Name))
+                elif isinstance(statement, ast.Import):
+                    names.update(alias.asname or alias.name.split(".")[0] for alias in statement.names)
+                elif isinstance(statement, ast.ImportFrom):
+                    for alias in statement.names:
+                        if alias.name == "*":
+                            module = importlib.import_module(statement.module)
+                            names.update(getattr(module, "__all__", None) or [k for k in vars(module) if not k.startswith("_")])
+                        else:
+                            names.add(alias.asname or alias.name)
+        self.globalblocks = len(self.blocks)
+        return names
+
+    @staticmethod
+    def loadedNames(codeobj):
+        """Returns names that compiled code (and functions nested in it) looks up outside of its functions."""
+        names = set()
+        for instruction in dis.get_instructions(codeobj):
+            if instruction.opname in ("LOAD_NAME", "LOAD_GLOBAL"):
+                names.add(instruction.argval)
+        for const in codeobj.co_consts:
+            if isinstance(const, types.CodeType):
+                names |= CodeGen.loadedNames(const)
+        return names
+
+    def undefinedNames(self, source, mode, parameters=()):
+        """Returns names that source refers to, that are neither parameters nor defined at module level. Raises SyntaxError if it does not compile."""
+        undefined = self.loadedNames(compile(source, "", mode)) - self.definedNames() - set(parameters)
+        # recursive LazyBound calls functions that get defined after their body is compiled
+        return undefined - set(self.boundparsers.values()) - set(self.boundbuilders.values())
+
+    def purge(self, since):
+        """Removes blocks appended since given count that do not compile or refer to undefined names. Returns whether there were any."""
+        invalid = []
+        for block in self.blocks[since:]:
+            try:
+                if self.undefinedNames(block, "exec"):
+                    invalid.append(block)
+            except SyntaxError:
+                invalid.append(block)
+        if invalid:
+            for block in invalid:
+                self.blocks.remove(block)
+            self.globalnames = set(dir(builtins))
+            self.globalblocks = 0
+        return bool(invalid)
+
+    def validate(self, since, emitted):
+        """Hybrid compilation checks emitted code, so that a faulty emitter gets linked instead of breaking the whole module. Code must compile and must not refer to names that the module does not define, but calls are not checked."""
+        if self.purge(since):
+            raise SyntaxError("emitted code does not compile or refers to undefined names")
+        undefined = self.undefinedNames(emitted, "eval", ("io", "this", "obj"))
+        if undefined:
+            raise NameError("emitted code refers to undefined names: %s" % ", ".join(sorted(undefined)))
+
     def append(self, block):
         block = [s for s in block.splitlines() if s.strip()]
         firstline = block[0]
@@ -316,6 +924,168 @@ def evaluate(param, context):
     return param(context) if callable(param) else param
 
 
+def libfunction(func):
+    """Name of a function exported by construct.lib, which compiled code can refer to, or None."""
+    name = getattr(func, "__name__", None)
+    if name is not None and getattr(sys.modules["construct.lib"], name, None) is func:
+        return name
+    return None
+
+
+def contextreads(param):
+    """Used internally. Set of context keys that a parameter reads, or None if it can read anything (like lambdas) or reads special keys (like _ or _index)."""
+    if isinstance(param, Path):
+        fields = []
+        while param._Path__parent is not None:
+            fields.append(param._Path__field)
+            param = param._Path__parent
+        if param._Path__name != "this" or not fields or any(str(field).startswith("_") for field in fields):
+            return None
+        return {fields[-1]}
+    if isinstance(param, UniExpr):
+        return contextreads(param.operand)
+    if isinstance(param, BinExpr):
+        lhs, rhs = contextreads(param.lhs), contextreads(param.rhs)
+        return None if lhs is None or rhs is None else lhs | rhs
+    if isinstance(param, FuncPath) and param._FuncPath__operand is not None:
+        return contextreads(param._FuncPath__operand)
+    if callable(param):
+        return None
+    return set()
+
+
+class _UnknownState(Exception):
+    pass
+
+
+def schemafingerprint(root):
+    """
+    Used internally. Describes structure of a construct tree, by walking attributes of constructs and expressions and their lists dicts and plain values. Every walked object gets a digest of its own structure, so equal subtrees have equal digests regardless of where they are used. Functions are described by their bytecode, closures and defaults.
+
+    Returns a dict that maps id of every walked object to (hex digest, pure) and a dict that maps id of every walked object to its path from root (a tuple of (0, attribute name), (1, item key) and (2, closure cell index) steps), or (None, None) if some object has no describable state. Objects are pure if only constructs, expressions, functions and plain values are reachable from them, so that their digests describe their behavior completely. Other objects with attributes (like streams held by Rebuffered) are described but can hold state.
+    """
+    digests = {}
+    paths = {}
+    def walk(obj, path):
+        t = type(obj)
+        if t in _plaintypes:
+            return repr(obj), True
+        if id(obj) in digests:
+            return digests[id(obj)]
+        if id(obj) in paths:
+            # reference cycle
+            raise _UnknownState
+        paths[id(obj)] = path
+        pure = True
+        if isinstance(obj, (list, tuple)):
+            parts = [t.__name__]
+            for i,v in enumerate(obj):
+                if type(v) in _plaintypes:
+                    parts.append(repr(v))
+                    continue
+                digest, subpure = walk(v, path + ((1, i),))
+                parts.append(digest)
+                pure = pure and subpure
+        elif isinstance(obj, dict):
+            parts = [t.__name__]
+            for k,v in dict.items(obj):
+                keyrepr = repr(k)
+                if " at 0x" in keyrepr:
+                    raise _UnknownState
+                if type(v) in _plaintypes:
+                    parts += [keyrepr, repr(v)]
+                    continue
+                digest, subpure = walk(v, path + ((1, k),))
+                parts += [keyrepr, digest]
+                pure = pure and subpure
+        elif t in (set, frozenset, bytearray):
+            parts = ["%s%r" % (t.__name__, sorted(obj))]
+        elif isinstance(obj, type):
+            parts = [_classdigest(obj)]
+        elif t is types.FunctionType:
+            # macros emit code from closures, so closures matter as much as bytecode
+            parts = [_codedigest(obj.__code__)]
+            for i,cell in enumerate(obj.__closure__ or ()):
+                digest, subpure = walk(cell.cell_contents, path + ((2, i),))
+                parts.append(digest)
+                pure = pure and subpure
+            if obj.__defaults__ or obj.__kwdefaults__:
+                for k in ("__defaults__", "__kwdefaults__"):
+                    digest, subpure = walk(getattr(obj, k), path + ((0, k),))
+                    parts.append(digest)
+                    pure = pure and subpure
+        elif t is types.ModuleType:
+            parts = ["module %s" % (obj.__name__,)]
+        elif t is types.BuiltinFunctionType:
+            parts = ["builtin %s.%s" % (obj.__module__, obj.__qualname__)]
+        elif isinstance(obj, LazyBound):
+            # compiled code binds to whatever the function returns, which its bytecode does not describe
+            raise _UnknownState
+        elif hasattr(obj, "__dict__") and not hasattr(t, "__slots__"):
+            parts = [_classdigest(t)]
+            pure = isinstance(obj, (Construct, ExprMixin))
+            for k,v in vars(obj).items():
+                if type(v) in _plaintypes:
+                    parts += [k, repr(v)]
+                    continue
+                digest, subpure = walk(v, path + ((0, k),))
+                parts += [k, digest]
+                pure = pure and subpure
+        else:
+            raise _UnknownState
+        digests[id(obj)] = result = (hashlib.sha1("\n".join(parts).encode(errors="surrogatepass")).hexdigest(), pure)
+        return result
+    try:
+        walk(root, ())
+    except (_UnknownState, TypeError, ValueError, RecursionError):
+        return None, None
+    return digests, paths
+
+
+_plaintypes = frozenset([int, float, complex, bool, str, bytes, type(None)])
+# digests are weakly keyed, so that fingerprinting does not keep classes and functions alive
+_classdigests = weakref.WeakKeyDictionary()
+_classcounter = itertools.count()
+_codedigests = {}
+
+
+def _classdigest(cls):
+    digest = _classdigests.get(cls)
+    if digest is None:
+        digest = "class %s.%s" % (cls.__module__, cls.__qualname__)
+        if "<locals>" in cls.__qualname__:
+            # classes defined in functions can share names, and ids of collected classes get reused
+            digest += " %d" % (next(_classcounter),)
+        _classdigests[cls] = digest
+    return digest
+
+
+def _codedigest(code):
+    # code objects compare equal regardless of their line numbers, so they are keyed by identity
+    key = id(code)
+    entry = _codedigests.get(key)
+    if entry is None or entry[0]() is not code:
+        def forget(ref):
+            if _codedigests.get(key, (None,))[0] is ref:
+                del _codedigests[key]
+        entry = (weakref.ref(code, forget), "function %s %s" % (code.co_name, hashlib.sha1(marshal.dumps(code)).hexdigest()))
+        _codedigests[key] = entry
+    return entry[1]
+
+
+def schemaresolve(root, path):
+    """Used internally. Inverse of schemafingerprint paths."""
+    obj = root
+    for kind,key in path:
+        if kind == 0:
+            obj = getattr(obj, key)
+        elif kind == 1:
+            obj = obj[key]
+        else:
+            obj = obj.__closure__[key].cell_contents
+    return obj
+
+
 #===============================================================================
 # abstract constructs
 #===============================================================================
@@ -336,10 +1106,13 @@ class Construct(object):
     * `sizeof`
     * `compile`
     * `benchmark`
+    * `parse_async`
+    * `build_async`
 
     Subclass authors should not override the external methods. Instead, another API is available:
 
     * `_parse`
+    * `_parseasync`
     * `_build`
     * `_sizeof`
     * `_actualsize`
@@ -397,17 +1170,21 @@ class Construct(object):
 
         Context entries are passed only as keyword parameters \*\*contextkw.
 
+        Large buffers can be parsed without copying payloads by passing `MemoryviewIO(data)` to parse_stream() instead, see :class:`~construct.core.MemoryviewIO`.
+
         :param \*\*contextkw: context entries, usually empty
 
         :returns: some value, usually based on bytes read from the stream but sometimes it is computed from nothing or from the context dictionary, sometimes its non-deterministic
 
         :raises ConstructError: raised for any reason
         """
-        return self.parse_stream(io.BytesIO(data), **contextkw)
+        return self.parse_stream(_ParsingBytesIO(data), **contextkw)
 
     def parse_stream(self, stream, **contextkw):
         r"""
         Parse a stream. Files, pipes, sockets, and other streaming sources of data are handled by this method. See parse().
+
+        Regular files that are parsed with a lot of seeking (Pointer Peek Lazy etc) can be wrapped with `MmapIO.from_file(f)` first, see :class:`~construct.core.MmapIO`.
         """
         contextkw.pop('_parsing', None)
         contextkw.pop('_building', None)
@@ -421,9 +1198,17 @@ class Construct(object):
     def parse_file(self, filename, **contextkw):
         r"""
         Parse a closed binary file. See parse().
+
+        Regular files are memory-mapped (see :class:`~construct.core.MmapIO`), other files are read through a regular buffered stream.
         """
         with open(filename, 'rb') as f:
-            return self.parse_stream(f, **contextkw)
+            try:
+                stream = MmapIO.from_file(f)
+            except (ValueError, OSError):
+                # empty files, pipes and devices cannot be mapped
+                return self.parse_stream(f, **contextkw)
+            with stream:
+                return self.parse_stream(stream, **contextkw)
 
     def _parsereport(self, stream, context, path):
         obj = self._parse(stream, context, path)
@@ -435,6 +1220,37 @@ class Construct(object):
         """Override in your subclass."""
         raise NotImplementedError
 
+    async def parse_async(self, reader, **contextkw):
+        r"""
+        Parse from an asyncio.StreamReader (or any object with awaitable `readexactly` and `read` methods), awaiting exactly the bytes each field needs. See parse().
+
+        Fixed-size fields, Prefixed FixedSized PascalString Struct Sequence FocusedSeq Array Switch IfThenElse VarInt and adapters over them are supported. Contents of Prefixed FixedSized (and any fixed-size field) are parsed from memory once their bytes arrived, so anything can be nested inside them. Constructs that need seeking the stream raise StreamError.
+        """
+        contextkw.pop('_parsing', None)
+        contextkw.pop('_building', None)
+        contextkw.pop('_sizing', None)
+        context = Context(_parsing=True, **contextkw)
+        try:
+            return await self._parsereportasync(AsyncReaderIO(reader), context, "(parsing)")
+        except CancelParsing:
+            pass
+
+    async def _parsereportasync(self, stream, context, path):
+        obj = await self._parseasync(stream, context, path)
+        if self.parsed is not None:
+            self.parsed(obj, context)
+        return obj
+
+    async def _parseasync(self, stream, context, path):
+        """Override in your subclass. By default, fixed-size constructs await their bytes and then parse them from memory."""
+        try:
+            size = self._sizeof(context, path)
+        except SizeofError:
+            raise StreamError("%s cannot be parsed asynchronously, its size is not known upfront" % (self.__class__.__name__,), path=path)
+        offset = stream.tell()
+        data = await stream_read_async(stream, size, path)
+        return self._parse(BytesIOWithOffsets(data, stream, offset), context, path)
+
     def build(self, obj, **contextkw):
         r"""
         Build an object in memory (a bytes object).
@@ -463,6 +1279,62 @@ class Construct(object):
         context = Context(_building=True, **contextkw)
         self._build(obj, stream, context, "(building)")
 
+    def build_chunks(self, obj, **contextkw):
+        r"""
+        Build an object into a list of bytes chunks, using a :class:`~construct.core.ChunkedBytesIO`. Nested Prefixed and FixedSized do not copy bytes built by their subcons, so deeply nested length-prefixed builds are linear in size of the output. The chunks can be joined once, or passed to `os.writev` or `socket.sendmsg` directly. See build().
+
+        :returns: list of bytes
+
+        Example::
+
+            >>> Prefixed(Byte, GreedyBytes).build_chunks(b"data")
+            [b'\x04', b'data']
+        """
+        stream = ChunkedBytesIO()
+        self.build_stream(obj, stream, **contextkw)
+        return stream.chunks
+
+    def build_into(self, obj, buffer, offset=0, **contextkw):
+        r"""
+        Build an object directly into a preallocated writable buffer (bytearray memoryview mmap etc), starting at given offset, without allocating a stream or a bytes object. Fixed-size fields are packed in place. Buffer is not resized, building past its end raises StreamError. Bytes skipped by Seek or Pointer are zeroed like build() does, so when sizeof is static, the same buffer can be reused for every object. See build().
+
+        :param buffer: writable object supporting the buffer protocol
+        :param offset: integer, where to start writing, stream positions (as seen by Tell Pointer Seek) are relative to it, must be within the buffer
+        :param \*\*contextkw: context entries, usually empty
+
+        :returns: integer, amount of bytes written after offset (including bytes written by Pointer)
+
+        :raises ConstructError: raised for any reason
+        :raises ValueError: offset is negative or past the end of the buffer
+
+        Example::
+
+            >>> d = Struct("a" / Int16ub, "b" / Int8ub)
+            >>> buffer = bytearray(d.sizeof())
+            >>> d.build_into(dict(a=1, b=2), buffer)
+            3
+            >>> buffer
+            bytearray(b'\x00\x01\x02')
+        """
+        stream = MemoryviewIO(buffer)
+        if stream.buffer.readonly:
+            raise StreamError("buffer is read-only", path="(building)")
+        if not 0 <= offset <= len(stream.buffer):
+            raise ValueError("offset %d is outside of buffer of %d bytes" % (offset, len(stream.buffer)))
+        # positions start at 0 like in build(), so Tell Pointer Seek stay within the region after offset
+        stream.buffer = stream.buffer[offset:]
+        stream.zerofill = True
+        self.build_stream(obj, stream, **contextkw)
+        return max(stream.highwater, stream.position)
+
+    async def build_async(self, obj, writer, **contextkw):
+        r"""
+        Build an object and write it into an asyncio.StreamWriter (or any object with `write` and awaitable `drain` methods), waiting for the writer to drain, so that slow peers apply backpressure. See build().
+        """
+        data = self.build(obj, **contextkw)
+        writer.write(data)
+        await writer.drain()
+
     def build_file(self, obj, filename, **contextkw):
         r"""
         Build an object into a closed binary file. See build().
@@ -512,16 +1384,45 @@ class Construct(object):
     def _actualsize(self, stream, context, path):
         return self._sizeof(context, path)
 
-    def compile(self, filename=None):
+    def compile(self, filename=None, cachedir=None, hybrid=False):
         """
         Transforms a construct into another construct that does same thing (has same parsing and building semantics) but is much faster when parsing. Already compiled instances just compile into itself.
 
+        Constructs that do not compile are linked, meaning the compiled code calls their interpreted methods. The ``report`` attribute of returned instance lists every such construct, with its path, whether it was parsing building or sizeof, and the reason. In hybrid mode, constructs whose compilation raises any exception or emits code that does not compile or refers to names the module does not define are linked as well, instead of failing the whole compilation. Calls in emitted code are not checked, so an emitter can still fail when parsing.
+
         Optionally, partial source code can be saved to a text file. This is meant only to inspect the generated code, not to import it from external scripts.
 
+        Optionally, compiled bytecode can be cached in a directory, so that other processes compiling a structurally identical construct skip both code generation and compilation. Cache entries are keyed by a fingerprint of the construct tree, Python version and Construct version. Instances and functions that the compiled code links to are taken from the construct being compiled, not from the cache. Trees that contain objects with undescribable state are compiled without cache.
+
+        :param filename: optional, string, where to save the source code
+        :param cachedir: optional, string, directory for cached bytecode, must exist
+        :param hybrid: optional, bool, link constructs that fail to compile instead of raising, default is False
+
         :returns: Compiled instance
         """
 
-        code = CodeGen()
+        fingerprints, paths = schemafingerprint(self)
+        cachekey = cachefile = None
+        if fingerprints is not None:
+            key = "%s %s %s %s" % (fingerprints[id(self)][0], sys.implementation.cache_tag, version_string, bool(hybrid))
+            cachekey = hashlib.sha1(key.encode()).hexdigest()
+            if cachedir is not None:
+                cachefile = os.path.join(cachedir, "%s.construct" % cachekey)
+            entry = compiledcache.get(cachekey)
+            if entry is None and cachefile is not None:
+                entry = self._compileload(cachefile)
+                if entry is not None:
+                    compiledcache[cachekey] = entry
+            if entry is not None:
+                compiled = self._compileentry(entry)
+                if compiled is not None:
+                    if filename:
+                        with open(filename, "wt") as f:
+                            f.write(compiled.source)
+                    return compiled
+
+        # functions shared from other compiles cannot be saved to disk
+        code = CodeGen(fingerprints, shared=cachedir is None, hybrid=hybrid)
         code.append("""
             # generated by Construct, this source is for inspection only! do not import!
 
@@ -536,11 +1437,22 @@ class Construct(object):
                 return func(BytesIO(data))
             def reuse(obj, func):
                 return func(obj)
+            def parse_const(value, expected):
+                if not value == expected:
+                    raise ConstError("parsing expected %r but parsed %r" % (expected, value))
+                return value
+            def checksize(size, error, message):
+                if size < 0:
+                    raise error(message.format(size), path="(sizeof)")
+                return size
 
             linkedinstances = {}
             linkedparsers = {}
             linkedbuilders = {}
+            linkedsizeofs = {}
             userfunction = {}
+            sharedparsers = {}
+            sharedbuilders = {}
 
             len_ = len
             sum_ = sum
@@ -553,7 +1465,12 @@ class Construct(object):
                 return {self._compileparse(code)}
             def buildall(obj, io, this):
                 return {self._compilebuild(code)}
-            compiled = Compiled(parseall, buildall)
+            def sizeofall(this):
+                try:
+                    return {self._compilesizeof(code)}
+                except (KeyError, AttributeError):
+                    raise SizeofError("cannot calculate size, key not found in context", path="(sizeof)")
+            compiled = Compiled(parseall, buildall, sizeofall)
         """)
         source = code.toString()
 
@@ -562,22 +1479,86 @@ class Construct(object):
                 f.write(source)
 
         modulename = hexlify(hashlib.sha1(source.encode()).digest()).decode()
+        c = compile(source, '', 'exec')
+        compiled = self._compilemodule(modulename, source, c, code.linkedinstances, code.userfunction, code.sharedparsers, code.sharedbuilders, code.report)
+
+        if code.shared:
+            namespace = compiled.module.__dict__
+            for key,emitted in code.shareableparsers.items():
+                if key not in sharedparsercache:
+                    sharedparsercache[key] = eval(f"lambda io, this: {emitted}", namespace)
+            for key,emitted in code.shareablebuilders.items():
+                if key not in sharedbuildercache:
+                    sharedbuildercache[key] = eval(f"lambda obj, io, this: {emitted}", namespace)
+        if cachekey is not None:
+            try:
+                linkedpaths = {k:paths[id(field)] for k,field in code.linkedinstances.items()}
+                userpaths = {k:paths[id(func)] for k,func in code.userfunction.items()}
+            except KeyError:
+                return compiled
+            entry = (modulename, source, c, linkedpaths, userpaths, code.sharedparsers, code.sharedbuilders, code.report)
+            compiledcache[cachekey] = entry
+            if cachefile is not None:
+                self._compilestore(cachefile, entry)
+        return compiled
+
+    def _compilemodule(self, modulename, source, c, linkedinstances, userfunction, sharedparsers, sharedbuilders, report):
+        """Used internally."""
         module_spec = importlib.machinery.ModuleSpec(modulename, None)
         module = importlib.util.module_from_spec(module_spec)
-        c = compile(source, '', 'exec')
         exec(c, module.__dict__)
 
-        module.linkedinstances = code.linkedinstances
-        module.linkedparsers = code.linkedparsers
-        module.linkedbuilders = code.linkedbuilders
-        module.userfunction = code.userfunction
+        module.linkedinstances = linkedinstances
+        module.linkedparsers = {k:field._parse for k,field in linkedinstances.items()}
+        module.linkedbuilders = {k:field._build for k,field in linkedinstances.items()}
+        module.linkedsizeofs = {k:field._sizeof for k,field in linkedinstances.items()}
+        module.userfunction = userfunction
+        module.sharedparsers = sharedparsers
+        module.sharedbuilders = sharedbuilders
         compiled = module.compiled
         compiled.source = source
         compiled.module = module
         compiled.modulename = modulename
         compiled.defersubcon = self
+        compiled.report = ListContainer(Container(path=path, kind=kind, construct=construct, reason=reason) for path,kind,construct,reason in report)
         return compiled
 
+    def _compileentry(self, entry):
+        """Used internally. Compiled code refers to linked objects by paths, which are resolved against this construct. Returns None if some path does not resolve."""
+        modulename, source, c, linkedpaths, userpaths, sharedparsers, sharedbuilders, report = entry
+        try:
+            linkedinstances = {k:schemaresolve(self, path) for k,path in linkedpaths.items()}
+            userfunction = {k:schemaresolve(self, path) for k,path in userpaths.items()}
+        except Exception:
+            return None
+        return self._compilemodule(modulename, source, c, linkedinstances, userfunction, sharedparsers, sharedbuilders, report)
+
+    def _compilestore(self, cachefile, entry):
+        """Used internally. Saves compiled bytecode with paths of linked objects."""
+        modulename, source, c, linkedpaths, userpaths, sharedparsers, sharedbuilders, report = entry
+        if sharedparsers or sharedbuilders:
+            return
+        try:
+            data = marshal.dumps((modulename, source, c, linkedpaths, userpaths, report))
+        except ValueError:
+            return
+        tempfile = "%s.%d.tmp" % (cachefile, os.getpid())
+        try:
+            with open(tempfile, "wb") as f:
+                f.write(data)
+            os.replace(tempfile, cachefile)
+        except OSError:
+            pass
+
+    def _compileload(self, cachefile):
+        """Used internally. Returns None if there is no usable cache entry."""
+        try:
+            with open(cachefile, "rb") as f:
+                modulename, source, c, linkedpaths, userpaths, report = marshal.loads(f.read())
+        except Exception:
+            return None
+        return (modulename, source, c, linkedpaths, userpaths, {}, {}, report)
+
     def _compileinstance(self, code):
         """Used internally."""
         if id(self) in code.linkedinstances:
@@ -589,30 +1570,99 @@ class Construct(object):
         code.linkedinstances[id(self)] = field
         code.linkedparsers[id(self)] = field._parse
         code.linkedbuilders[id(self)] = field._build
+        code.linkedsizeofs[id(self)] = field._sizeof
+
+    def _compilefallback(self, code, kind, blocks, error):
+        """Used internally. Returns whether the construct should be linked instead of compiled."""
+        if not isinstance(error, NotImplementedError):
+            if not code.hybrid:
+                return False
+            code.purge(blocks)
+        code.fallback(kind, self, error)
+        self._compileinstance(code)
+        return True
 
     def _compileparse(self, code):
         """Used internally."""
+        key = code.nodeKey(self)
+        blocks = len(code.blocks)
+        reports = len(code.report)
+        if self.name:
+            code.path.append(self.name)
         try:
-            if id(self) in code.parsercache:
-                return code.parsercache[id(self)]
-            emitted = self._emitparse(code)
-            code.parsercache[id(self)] = emitted
+            if key in code.parsercache:
+                return code.parsercache[key]
+            if code.shared and key in sharedparsercache:
+                aid = code.allocateId()
+                code.sharedparsers[aid] = sharedparsercache[key]
+                emitted = f"sharedparsers[{aid}](io, this)"
+            else:
+                emitted = self._emitparse(code)
+                if code.hybrid:
+                    code.validate(blocks, emitted)
+                if code.shared and type(key) is str and code.definedFunctions(blocks) and len(code.report) == reports:
+                    code.shareableparsers[key] = emitted
+            code.parsercache[key] = emitted
             return emitted
-        except NotImplementedError:
-            self._compileinstance(code)
+        except Exception as e:
+            if not self._compilefallback(code, "parse", blocks, e):
+                raise
             return f"linkedparsers[{id(self)}](io, this, '(???)')"
+        finally:
+            if self.name:
+                code.path.pop()
 
     def _compilebuild(self, code):
         """Used internally."""
+        key = code.nodeKey(self)
+        blocks = len(code.blocks)
+        reports = len(code.report)
+        if self.name:
+            code.path.append(self.name)
         try:
-            if id(self) in code.buildercache:
-                return code.buildercache[id(self)]
-            emitted = self._emitbuild(code)
-            code.buildercache[id(self)] = emitted
+            if key in code.buildercache:
+                return code.buildercache[key]
+            if code.shared and key in sharedbuildercache:
+                aid = code.allocateId()
+                code.sharedbuilders[aid] = sharedbuildercache[key]
+                emitted = f"sharedbuilders[{aid}](obj, io, this)"
+            else:
+                emitted = self._emitbuild(code)
+                if code.hybrid:
+                    code.validate(blocks, emitted)
+                if code.shared and type(key) is str and code.definedFunctions(blocks) and len(code.report) == reports:
+                    code.shareablebuilders[key] = emitted
+            code.buildercache[key] = emitted
             return emitted
-        except NotImplementedError:
-            self._compileinstance(code)
+        except Exception as e:
+            if not self._compilefallback(code, "build", blocks, e):
+                raise
             return f"linkedbuilders[{id(self)}](obj, io, this, '(???)')"
+        finally:
+            if self.name:
+                code.path.pop()
+
+    def _compilesizeof(self, code):
+        """Used internally."""
+        key = code.nodeKey(self)
+        blocks = len(code.blocks)
+        if self.name:
+            code.path.append(self.name)
+        try:
+            if key in code.sizeofcache:
+                return code.sizeofcache[key]
+            emitted = self._emitsizeof(code)
+            if code.hybrid:
+                code.validate(blocks, emitted)
+            code.sizeofcache[key] = emitted
+            return emitted
+        except Exception as e:
+            if not self._compilefallback(code, "sizeof", blocks, e):
+                raise
+            return f"linkedsizeofs[{id(self)}](this, '(???)')"
+        finally:
+            if self.name:
+                code.path.pop()
 
     def _emitparse(self, code):
         """Override in your subclass."""
@@ -622,6 +1672,22 @@ class Construct(object):
         """Override in your subclass."""
         raise NotImplementedError
 
+    def _emitsizeof(self, code):
+        """Override in your subclass. Returns an expression on this context, static sizes should be integer literals."""
+        raise NotImplementedError
+
+    def _emitreads(self, code):
+        """Override in your subclass. Returns set of context keys that compiled parser reads, or None if it can read anything. Struct Sequence FocusedSeq do not create child contexts if their members only read plain keys."""
+        return None
+
+    def _emitbitfield(self):
+        """Override in your subclass, if the construct is a field of static bit length inside Bitwise. Returns length in bits, kind ("int" or "flag" or "pad") and signedness."""
+        raise NotImplementedError
+
+    def _emitfixedparse(self, code):
+        """Override in your subclass, if the construct always parses the same amount of bytes using a struct format. Returns byte order ("<" or ">" or None if it does not matter), format and a function that turns an expression on the unpacked item into the parsed value (or None if format does not unpack any item)."""
+        raise NotImplementedError
+
     def benchmark(self, sampledata, filename=None):
         """
         Measures performance of your construct (its parsing and building runtime), both for the original instance and the compiled instance. Uses timeit module, over at min 1 loop, and at max over 100 millisecond time.
@@ -807,12 +1873,22 @@ class Subconstruct(Construct):
     def _parse(self, stream, context, path):
         return self.subcon._parsereport(stream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        if type(self)._parse is not Subconstruct._parse:
+            return await super()._parseasync(stream, context, path)
+        return await self.subcon._parsereportasync(stream, context, path)
+
     def _build(self, obj, stream, context, path):
         return self.subcon._build(obj, stream, context, path)
 
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        if type(self)._sizeof is not Subconstruct._sizeof:
+            raise NotImplementedError
+        return self.subcon._compilesizeof(code)
+
 
 class Adapter(Subconstruct):
     r"""
@@ -826,6 +1902,12 @@ class Adapter(Subconstruct):
         obj = self.subcon._parsereport(stream, context, path)
         return self._decode(obj, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        if type(self)._parse is not Adapter._parse:
+            return await Construct._parseasync(self, stream, context, path)
+        obj = await self.subcon._parsereportasync(stream, context, path)
+        return self._decode(obj, context, path)
+
     def _build(self, obj, stream, context, path):
         obj2 = self._encode(obj, context, path)
         buildret = self.subcon._build(obj2, stream, context, path)
@@ -879,7 +1961,7 @@ class Tunnel(Subconstruct):
         return self.subcon.parse(data, **context)
 
     def _build(self, obj, stream, context, path):
-        stream2 = io.BytesIO()
+        stream2 = ChunkedBytesIO() if type(stream) is ChunkedBytesIO else io.BytesIO()
         buildret = self.subcon._build(obj, stream2, context, path)
         data = stream2.getvalue()
         data = self._encode(data, context, path)
@@ -899,12 +1981,13 @@ class Tunnel(Subconstruct):
 class Compiled(Construct):
     """Used internally."""
 
-    def __init__(self, parsefunc, buildfunc):
+    def __init__(self, parsefunc, buildfunc, sizeoffunc=None):
         super().__init__()
         self.source = None
         self.defersubcon = None
         self.parsefunc = parsefunc
         self.buildfunc = buildfunc
+        self.sizeoffunc = sizeoffunc
 
     def _parse(self, stream, context, path):
         return self.parsefunc(stream, context)
@@ -913,9 +1996,11 @@ class Compiled(Construct):
         return self.buildfunc(obj, stream, context)
 
     def _sizeof(self, context, path):
-        return self.defersubcon._sizeof(context, path)
+        if self.sizeoffunc is None:
+            return self.defersubcon._sizeof(context, path)
+        return self.sizeoffunc(context)
 
-    def compile(self, filename=None):
+    def compile(self, filename=None, cachedir=None, hybrid=False):
         return self
 
     def benchmark(self, sampledata, filename=None):
@@ -931,7 +2016,7 @@ class Bytes(Construct):
 
     Parses into a bytes (of given length). Builds into the stream directly (but checks that given object matches specified length). Can also build from an integer for convenience (although BytesInteger should be used instead). Size is the specified length.
 
-    Can also build from a bytearray.
+    Can also build from a bytearray or memoryview. When parsing from :class:`~construct.core.MemoryviewIO`, parses into a memoryview slice of the buffer instead, without copying.
 
     :param length: integer or context lambda
 
@@ -968,12 +2053,12 @@ class Bytes(Construct):
 
     def _parse(self, stream, context, path):
         length = self.length(context) if callable(self.length) else self.length
-        return stream_read(stream, length, path)
+        return stream_read_view(stream, length, path)
 
     def _build(self, obj, stream, context, path):
         length = self.length(context) if callable(self.length) else self.length
         data = integer2bytes(obj, length) if isinstance(obj, int) else obj
-        data = bytes(data) if type(data) is bytearray else data
+        data = bytes(data) if type(data) in (bytearray, memoryview) else data
         stream_write(stream, data, length, path)
         return data
 
@@ -983,12 +2068,23 @@ class Bytes(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        return f"{self.length}"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.length)
+
     def _emitparse(self, code):
         return f"io.read({self.length})"
 
     def _emitbuild(self, code):
         return f"(io.write(obj), obj)[1]"
 
+    def _emitfixedparse(self, code):
+        if not isinstance(self.length, int) or self.length < 0:
+            raise NotImplementedError
+        return None, f"{self.length}s", lambda item: item
+
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=self.length)
 
@@ -1000,7 +2096,7 @@ class GreedyBytes(Construct):
 
     Parses the stream to the end. Builds into the stream directly (without checks). Size is undefined.
 
-    Can also build from a bytearray.
+    Can also build from a bytearray or memoryview. When parsing from :class:`~construct.core.MemoryviewIO`, parses into a memoryview slice of the buffer instead, without copying.
 
     :raises StreamError: stream failed when reading until EOF
     :raises StringError: building from non-bytes value, perhaps unicode
@@ -1014,13 +2110,16 @@ class GreedyBytes(Construct):
     """
 
     def _parse(self, stream, context, path):
-        return stream_read_entire(stream, path)
+        return stream_read_entire_view(stream, path)
 
     def _build(self, obj, stream, context, path):
-        data = bytes(obj) if type(obj) is bytearray else obj
+        data = bytes(obj) if type(obj) in (bytearray, memoryview) else obj
         stream_write(stream, data, len(data), path)
         return data
 
+    def _emitreads(self, code):
+        return set()
+
     def _emitparse(self, code):
         return f"io.read()"
 
@@ -1069,7 +2168,8 @@ def Bitwise(subcon):
         size = subcon.sizeof()
         macro = Transformed(subcon, bytes2bits, size//8, bits2bytes, size//8)
     except SizeofError:
-        macro = Restreamed(subcon, bytes2bits, 1, bits2bytes, 8, lambda n: n//8)
+        macro = Restreamed(subcon, bytes2bits, 1, bits2bytes, 8, lambda n: n//8, bulk=True)
+
     def _emitseq(ksy, bitwise):
         return subcon._compileseq(ksy, bitwise=True)
     def _emitprimitivetype(ksy, bitwise):
@@ -1109,7 +2209,7 @@ def Bytewise(subcon):
         size = subcon.sizeof()
         macro = Transformed(subcon, bits2bytes, size*8, bytes2bits, size*8)
     except SizeofError:
-        macro = Restreamed(subcon, bits2bytes, 8, bytes2bits, 1, lambda n: n*8)
+        macro = Restreamed(subcon, bits2bytes, 8, bytes2bits, 1, lambda n: n*8, bulk=True)
     def _emitseq(ksy, bitwise):
         return subcon._compileseq(ksy, bitwise=False)
     def _emitprimitivetype(ksy, bitwise):
@@ -1168,6 +2268,17 @@ class FormatField(Construct):
             raise FormatFieldError("struct %r error during parsing" % self.fmtstr, path=path)
 
     def _build(self, obj, stream, context, path):
+        if type(stream) is MemoryviewIO:
+            # packs in place, without creating a bytes object
+            position = stream.position
+            try:
+                struct.pack_into(self.fmtstr, stream.buffer, position, obj)
+            except Exception:
+                if stream.buffer.readonly or position + self.length > len(stream.buffer):
+                    raise StreamError("stream.write() failed, cannot write %d bytes at %d into buffer of %d bytes" % (self.length, position, len(stream.buffer)), path=path)
+                raise FormatFieldError("struct %r error during building, given value %r" % (self.fmtstr, obj), path=path)
+            stream.position = position + self.length
+            return obj
         try:
             data = struct.pack(self.fmtstr, obj)
         except Exception:
@@ -1178,6 +2289,12 @@ class FormatField(Construct):
     def _sizeof(self, context, path):
         return self.length
 
+    def _emitsizeof(self, code):
+        return f"{self.length}"
+
+    def _emitreads(self, code):
+        return set()
+
     def _emitparse(self, code):
         fname = f"formatfield_{code.allocateId()}"
         code.append(f"{fname} = struct.Struct({repr(self.fmtstr)})")
@@ -1188,6 +2305,12 @@ class FormatField(Construct):
         code.append(f"{fname} = struct.Struct({repr(self.fmtstr)})")
         return f"(io.write({fname}.pack(obj)), obj)[1]"
 
+    def _emitfixedparse(self, code):
+        order = {"<": "<", ">": ">", "!": ">", "=": "<" if sys.byteorder == "little" else ">"}.get(self.fmtstr[0])
+        if order is None or len(self.fmtstr) != 2:
+            raise NotImplementedError
+        return order, self.fmtstr[1], lambda item: item
+
     def _emitprimitivetype(self, ksy, bitwise):
         endianity,format = self.fmtstr
         signed = format.islower()
@@ -1280,12 +2403,24 @@ class BytesInteger(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        return f"{self.length}"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.length, self.swapped)
+
     def _emitparse(self, code):
         return f"bytes2integer(swapbytes(io.read({self.length})) if {self.swapped} else io.read({self.length}), {self.signed})"
 
     def _emitbuild(self, code):
         return f"((io.write(swapbytes(integer2bytes(obj, {self.length}, {self.signed})) if ({self.swapped}) else integer2bytes(obj, {self.length}, {self.signed}))), obj)[1]"
 
+    def _emitfixedparse(self, code):
+        if not isinstance(self.length, int) or self.length < 1 or not isinstance(self.swapped, bool):
+            raise NotImplementedError
+        byteorder = "little" if self.swapped else "big"
+        return None, f"{self.length}s", lambda item: f"int.from_bytes({item}, {repr(byteorder)}, signed={self.signed})"
+
     def _emitprimitivetype(self, ksy, bitwise):
         if bitwise:
             assert not self.signed
@@ -1398,12 +2533,23 @@ class BitsInteger(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        return f"{self.length}"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.length, self.swapped)
+
     def _emitparse(self, code):
         return f"bits2integer(swapbytesinbits(io.read({self.length})) if {self.swapped} else io.read({self.length}), {self.signed})"
 
     def _emitbuild(self, code):
         return f"((io.write(swapbytesinbits(integer2bits(obj, {self.length}, {self.signed})) if ({self.swapped}) else integer2bits(obj, {self.length}, {self.signed}))), obj)[1]"
 
+    def _emitbitfield(self):
+        if not isinstance(self.length, int) or self.length < 1 or self.swapped is not False:
+            raise NotImplementedError
+        return self.length, "int", self.signed
+
     def _emitprimitivetype(self, ksy, bitwise):
         assert not self.signed
         assert not self.swapped
@@ -1633,6 +2779,18 @@ class VarInt(Construct):
             num = (num << 7) | b
         return num
 
+    async def _parseasync(self, stream, context, path):
+        acc = []
+        while True:
+            b = byte2int(await stream_read_async(stream, 1, path))
+            acc.append(b & 0b01111111)
+            if b & 0b10000000 == 0:
+                break
+        num = 0
+        for b in reversed(acc):
+            num = (num << 7) | b
+        return num
+
     def _build(self, obj, stream, context, path):
         if not isinstance(obj, int):
             raise IntegerError(f"value {obj} is not an integer", path=path)
@@ -1722,6 +2880,8 @@ class StringEncoded(Adapter):
         self.encoding = encoding
 
     def _decode(self, obj, context, path):
+        if isinstance(obj, memoryview):
+            obj = obj.tobytes()
         try:
             return obj.decode(self.encoding)
         except:
@@ -1737,15 +2897,42 @@ class StringEncoded(Adapter):
         except:
             raise StringError(f"cannot use encoding {self.encoding!r} to encode {obj!r}")
 
+    @staticmethod
+    def _emitdecode(code, data, encoding):
+        fname = f"parse_stringencoded_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                obj = {data}
+                try:
+                    return obj.decode({repr(encoding)})
+                except:
+                    raise StringError("cannot use encoding %r to decode %r" % ({repr(encoding)}, obj))
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
-        raise NotImplementedError
-        # Not sure what the correct implementation would be.
-        # return f"({self.subcon._compileparse(code)}).decode({repr(self.encoding)})"
+        return self._emitdecode(code, self.subcon._compileparse(code), self.encoding)
 
     def _emitbuild(self, code):
-        raise NotImplementedError
-        # This is not a valid implementation. obj.encode() should be inserted into subcon
-        # return f"({self.subcon._compilebuild(code)}).encode({repr(self.encoding)})"
+        fname = f"build_stringencoded_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                if not isinstance(obj, str):
+                    raise StringError("string encoding failed, expected unicode string")
+                string = obj
+                try:
+                    obj = obj.encode({repr(self.encoding)}) if obj else b""
+                except:
+                    raise StringError("cannot use encoding %r to encode %r" % ({repr(self.encoding)}, string))
+                {self.subcon._compilebuild(code)}
+                return string
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
 
 
 def PaddedString(length, encoding):
@@ -1799,7 +2986,7 @@ def PascalString(lengthfield, encoding):
     macro = StringEncoded(Prefixed(lengthfield, GreedyBytes), encoding)
 
     def _emitparse(code):
-        return f"io.read({lengthfield._compileparse(code)}).decode({repr(encoding)})"
+        return StringEncoded._emitdecode(code, f"stream_read(io, {lengthfield._compileparse(code)}, '(parsing)')", encoding)
     macro._emitparse = _emitparse
 
     def _emitseq(ksy, bitwise):
@@ -1890,12 +3077,21 @@ class Flag(Construct):
     def _sizeof(self, context, path):
         return 1
 
+    def _emitsizeof(self, code):
+        return "1"
+
+    def _emitreads(self, code):
+        return set()
+
     def _emitparse(self, code):
         return f"(io.read(1) != b'\\x00')"
 
     def _emitbuild(self, code):
         return f"((io.write(b'\\x01') if obj else io.write(b'\\x00')), obj)[1]"
 
+    def _emitbitfield(self):
+        return 1, "flag", False
+
     def _emitfulltype(self, ksy, bitwise):
         return dict(type=("b1" if bitwise else "u1"), _construct_render="Flag")
 
@@ -1993,6 +3189,9 @@ class Enum(Adapter):
         except KeyError:
             raise MappingError("building failed, no mapping for %r" % (obj,), path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         fname = f"factory_{code.allocateId()}"
         code.append(f"{fname} = {repr(self.decmapping)}")
@@ -2100,6 +3299,9 @@ class FlagsEnum(Adapter):
         except KeyError:
             raise MappingError("building failed, unknown label: %r" % (obj,), path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         return f"reuse(({self.subcon._compileparse(code)}), lambda x: Container({', '.join(f'{k}=bool(x & {v} == {v})' for k,v in self.flags.items()) }))"
 
@@ -2149,6 +3351,9 @@ class Mapping(Adapter):
         except (KeyError, TypeError):
             raise MappingError("building failed, no encoding mapping for %r" % (obj,), path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         fname = f"factory_{code.allocateId()}"
         code.append(f"{fname} = {repr(self.decmapping)}")
@@ -2163,6 +3368,31 @@ class Mapping(Adapter):
 #===============================================================================
 # structures and sequences
 #===============================================================================
+globalResultStreams = "strong"
+
+
+def setGlobalResultStreams(reference="strong"):
+    r"""
+    Sets how Containers parsed by Struct refer to the stream they were parsed from, in their `_io` entry. By default, they keep a strong reference, so every parsed Container keeps the stream (and its buffer) alive for as long as the Container lives. With weak references, `_io` is a proxy that works like the stream until the stream is gone (and raises ReferenceError afterwards), and streams that cannot be weakly referenced are left out. With no reference, `_io` is left out of results. Compiled parsers never add `_io` entries.
+
+    :param reference: "strong" or "weak" or None
+
+    :raises ValueError: reference is neither of these
+    """
+    if reference not in ("strong", "weak", None):
+        raise ValueError("reference must be 'strong' 'weak' or None, not %r" % (reference,))
+    global globalResultStreams
+    globalResultStreams = reference
+
+
+def _resultstream(obj, stream):
+    """Used internally. Adds the _io entry to a parsed Container unless references are strong, which Struct handles inline."""
+    if globalResultStreams == "weak":
+        try:
+            obj._io = weakref.proxy(stream)
+        except TypeError:
+            pass
+
 class Struct(Construct):
     r"""
     Sequence of usually named constructs, similar to structs in C. The members are parsed and build in the order they are defined. If a member is anonymous (its name is None) then it gets parsed and the value discarded, or it gets build from nothing (from None).
@@ -2173,6 +3403,8 @@ class Struct(Construct):
 
     Parses into a Container (dict with attribute and key access) where keys match subcon names. Builds from a dict (not necessarily a Container) where each member gets a value from the dict matching the subcon name. If field has build-from-none flag, it gets build even when there is no matching entry in the dict. Size is the sum of all subcon sizes, unless any subcon raises SizeofError.
 
+    Parsed Containers also have an `_io` entry, the stream they were parsed from. It keeps the stream alive, which can be changed with :func:`~construct.core.setGlobalResultStreams`.
+
     This class does context nesting, meaning its members are given access to a new dictionary where the "_" entry points to the outer context. When parsing, each member gets parsed and subcon parse return value is inserted into context under matching key only if the member was named. When building, the matching entry gets inserted into context before subcon gets build, and if subcon build returns a new value (not None) that gets replaced in the context.
 
     This class exposes subcons as attributes. You can refer to subcons that were inlined (and therefore do not exist as variable in the namespace) by accessing the struct attributes, under same name. Also note that compiler does not support this feature. See examples.
@@ -2235,7 +3467,10 @@ class Struct(Construct):
 
     def _parse(self, stream, context, path):
         obj = Container()
-        obj._io = stream
+        if globalResultStreams == "strong":
+            obj._io = stream
+        else:
+            _resultstream(obj, stream)
         context = context.create_child(_io=stream, _subcons=self._subcons)
         for sc in self.subcons:
             try:
@@ -2247,6 +3482,23 @@ class Struct(Construct):
                 break
         return obj
 
+    async def _parseasync(self, stream, context, path):
+        obj = Container()
+        if globalResultStreams == "strong":
+            obj._io = stream
+        else:
+            _resultstream(obj, stream)
+        context = context.create_child(_io=stream, _subcons=self._subcons)
+        for sc in self.subcons:
+            try:
+                subobj = await sc._parsereportasync(stream, context, path)
+                if sc.name:
+                    obj[sc.name] = subobj
+                    context[sc.name] = subobj
+            except StopFieldError:
+                break
+        return obj
+
     def _build(self, obj, stream, context, path):
         if obj is None:
             obj = Container()
@@ -2275,23 +3527,79 @@ class Struct(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    @staticmethod
+    def _emitsizeofsum(code, subcons):
+        # static sizes are summed at compile time, named members get their own child context like in _sizeof
+        static = 0
+        sizes = []
+        for sc in subcons:
+            size = sc._compilesizeof(code)
+            if size.isdigit():
+                static += int(size)
+            elif sc.name:
+                sizes.append(f"reuse(this.get_child({repr(sc.name)}, this), lambda this: {size})")
+            else:
+                sizes.append(size)
+        if not sizes:
+            return f"{static}"
+        return " + ".join([f"{static}"] + sizes)
+
+    def _emitsizeof(self, code):
+        return self._emitsizeofsum(code, self.subcons)
+
+    def _emitreads(self, code):
+        return None if code.contextReads(*self.subcons) is None else set()
+
     def _emitparse(self, code):
-        fname = f"parse_struct_{code.allocateId()}"
+        return self._emitparsefields(code, f"parse_struct_{code.allocateId()}", "Container()", "result", "result")
+
+    def _emitparsefields(self, code, fname, result, stopped, finished):
+        """Emits a parser function that collects named members into given result expression, and returns given expressions on result when a member stopped parsing or after the last member."""
+        runs = [(unpack, fields if unpack is not None else [(fields[0], fields[0]._compileparse(code))]) for unpack,fields in code.fixedRuns(self.subcons)]
+        # members that read nothing but their siblings can use the result as context, which saves creating a child context and converting every nested dict
+        elided = code.contextReads(*self.subcons) is not None
         block = f"""
             def {fname}(io, this):
-                result = Container()
-                this = this.create_child(_io=io)
+                result = {result}
+                {'this = result' if elided else 'this = this.create_child(_io=io)'}
                 try:
         """
-        for sc in self.subcons:
+        for unpack, fields in runs:
+            if unpack is not None:
+                # fused values are never dicts, so context can be updated directly at once
+                named = ", ".join(f"{repr(sc.name)}: {value}" for sc,value in fields if sc.name)
+                block += f"""
+                    fused = {unpack}
+                """
+                for sc, value in fields:
+                    if not sc.name and value != "None":
+                        block += f"""
+                    {value}
+                        """
+                if elided:
+                    block += f"""
+                    result.update({{{named}}})
+                    """
+                else:
+                    block += f"""
+                    values = {{{named}}}
+                    result.update(values)
+                    dict.update(this, values)
+                    """
+                continue
+            sc, value = fields[0]
+            if elided:
+                store = f"result[{repr(sc.name)}] = " if sc.name else ""
+            else:
+                store = f"result[{repr(sc.name)}] = this[{repr(sc.name)}] = " if sc.name else ""
             block += f"""
-                    {f'result[{repr(sc.name)}] = this[{repr(sc.name)}] = ' if sc.name else ''}{sc._compileparse(code)}
+                    {store}{value}
             """
         block += f"""
                     pass
                 except StopFieldError:
-                    pass
-                return result
+                    return {stopped}
+                return {finished}
         """
         code.append(block)
         return f"{fname}(io, this)"
@@ -2324,6 +3632,69 @@ class Struct(Construct):
         return [sc._compilefulltype(ksy, bitwise) for sc in self.subcons]
 
 
+class RecordStruct(Struct):
+    r"""
+    Equivalent to :class:`~construct.core.Struct`, but parses into a record instead of a Container. Records are instances of a :class:`~construct.lib.containers.Record` class generated for the names of members, that keeps fields in slots instead of a dictionary, so that large amounts of parsed records take a fraction of the memory. Records allow both attribute and key access and compare equal to Containers and dicts with same entries. Unlike Containers, records do not have an `_io` entry, and fields cannot be added to them. Building accepts records and dicts alike.
+
+    Record classes are cached by their field names, so equal structs (and their compiled parsers) produce instances of the same class. Compiled parsers call the record constructor directly.
+
+    :param \*subcons: Construct instances, list of members, some can be anonymous
+    :param \*\*subconskw: Construct instances, list of members (requires Python 3.6)
+
+    :raises ValueError: member name cannot be a record field, see :func:`~construct.lib.containers.recordclass`
+
+    Example::
+
+        >>> d = RecordStruct("num"/Int8ub, "data"/Bytes(this.num))
+        >>> obj = d.parse(b"\x04DATA")
+        >>> obj
+        Record(num=4, data=b'DATA')
+        >>> obj == Container(num=4, data=b"DATA")
+        True
+        >>> d.build(obj)
+        b'\x04DATA'
+        >>> type(obj) is d.recordclass
+        True
+    """
+
+    def __init__(self, *subcons, **subconskw):
+        super().__init__(*subcons, **subconskw)
+        self.recordclass = recordclass(sc.name for sc in self.subcons if sc.name)
+
+    def _parse(self, stream, context, path):
+        values = {}
+        context = context.create_child(_io=stream, _subcons=self._subcons)
+        for sc in self.subcons:
+            try:
+                subobj = sc._parsereport(stream, context, path)
+                if sc.name:
+                    values[sc.name] = subobj
+                    context[sc.name] = subobj
+            except StopFieldError:
+                break
+        return self.recordclass._fromdict(values)
+
+    async def _parseasync(self, stream, context, path):
+        values = {}
+        context = context.create_child(_io=stream, _subcons=self._subcons)
+        for sc in self.subcons:
+            try:
+                subobj = await sc._parsereportasync(stream, context, path)
+                if sc.name:
+                    values[sc.name] = subobj
+                    context[sc.name] = subobj
+            except StopFieldError:
+                break
+        return self.recordclass._fromdict(values)
+
+    def _emitparse(self, code):
+        fields = self.recordclass._fields
+        rname = f"record_{code.allocateId()}"
+        code.append(f"{rname} = recordclass({repr(fields)})")
+        finished = "%s(%s)" % (rname, ", ".join(f"result[{repr(name)}]" for name in fields))
+        return self._emitparsefields(code, f"parse_recordstruct_{code.allocateId()}", "{}", f"{rname}._fromdict(result)", finished)
+
+
 class Sequence(Construct):
     r"""
     Sequence of usually un-named constructs. The members are parsed and build in the order they are defined. If a member is named, its parsed value gets inserted into the context. This allows using members that refer to previous members.
@@ -2397,6 +3768,19 @@ class Sequence(Construct):
                 break
         return obj
 
+    async def _parseasync(self, stream, context, path):
+        obj = ListContainer()
+        context = context.create_child(_io=stream, _subcons=self._subcons)
+        for sc in self.subcons:
+            try:
+                subobj = await sc._parsereportasync(stream, context, path)
+                obj.append(subobj)
+                if sc.name:
+                    context[sc.name] = subobj
+            except StopFieldError:
+                break
+        return obj
+
     def _build(self, obj, stream, context, path):
         if obj is None:
             obj = ListContainer([None for sc in self.subcons])
@@ -2424,20 +3808,50 @@ class Sequence(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        return Struct._emitsizeofsum(code, self.subcons)
+
+    def _emitreads(self, code):
+        return None if code.contextReads(*self.subcons) is None else set()
+
     def _emitparse(self, code):
         fname = f"parse_sequence_{code.allocateId()}"
+        runs = [(unpack, fields if unpack is not None else [(fields[0], fields[0]._compileparse(code))]) for unpack,fields in code.fixedRuns(self.subcons)]
+        # members that read nothing but their siblings only need those siblings in a plain dict
+        reads = code.contextReads(*self.subcons)
         block = f"""
             def {fname}(io, this):
                 result = ListContainer()
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
+        """
+        if reads is None:
+            block += f"""
+                this = this.create_child(_io=io)
+            """
+        else:
+            block += f"""
+                this = {{}}
+            """
+        block += f"""
                 try:
         """
-        for sc in self.subcons:
+        for unpack, fields in runs:
+            if unpack is not None:
+                # fused values are never dicts, so context can be updated directly at once
+                block += f"""
+                    fused = {unpack}
+                    result.extend(({"".join(f"{value}, " for sc,value in fields)}))
+                """
+                named = ", ".join(f"{repr(sc.name)}: result[{i - len(fields)}]" for i,(sc,value) in enumerate(fields) if sc.name and (reads is None or sc.name in reads))
+                if named:
+                    block += f"""
+                    dict.update(this, {{{named}}})
+                    """
+                continue
+            sc, value = fields[0]
             block += f"""
-                    result.append({sc._compileparse(code)})
+                    result.append({value})
             """
-            if sc.name:
+            if sc.name and (reads is None or sc.name in reads):
                 block += f"""
                     this[{repr(sc.name)}] = result[-1]
                 """
@@ -2454,8 +3868,7 @@ class Sequence(Construct):
         fname = f"build_sequence_{code.allocateId()}"
         block = f"""
             def {fname}(obj, io, this):
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
+                this = this.create_child(_io=io)
                 try:
                     objiter = iter(obj)
                     retlist = ListContainer()
@@ -2529,6 +3942,19 @@ class Array(Subconstruct):
                 obj.append(e)
         return obj
 
+    async def _parseasync(self, stream, context, path):
+        count = evaluate(self.count, context)
+        if not 0 <= count:
+            raise RangeError("invalid count %s" % (count,), path=path)
+        discard = self.discard
+        obj = ListContainer()
+        for i in range(count):
+            context._index = i
+            e = await self.subcon._parsereportasync(stream, context, path)
+            if not discard:
+                obj.append(e)
+        return obj
+
     def _build(self, obj, stream, context, path):
         count = evaluate(self.count, context)
         if not 0 <= count:
@@ -2549,16 +3975,85 @@ class Array(Subconstruct):
             count = evaluate(self.count, context)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
+        if not 0 <= count:
+            raise SizeofError("invalid count %s" % (count,), path=path)
         size = 0
         for i in range(count):
             context._index = i
             size += self.subcon._sizeof(context, path)
         return size
 
+    def _emitsizeof(self, code):
+        size = self.subcon._compilesizeof(code)
+        if not size.isdigit():
+            raise NotImplementedError
+        if isinstance(self.count, int):
+            if self.count < 0:
+                raise NotImplementedError
+            return f"{self.count * int(size)}"
+        return f"checksize(({self.count}), SizeofError, 'invalid count {{}}')*{size}"
+
+    @staticmethod
+    def _emitbulkfield(subcon):
+        # arrays of FormatField elements are processed using one struct format for all elements
+        field = extractfield(subcon)
+        if not isinstance(field, FormatField) or len(field.fmtstr) != 2 or field.fmtstr[0] not in "<>!=@":
+            return None
+        return field.fmtstr[0], field.fmtstr[1], field.length
+
+    @staticmethod
+    def _emitbulkparse(code, count, subcon, discard):
+        bulk = Array._emitbulkfield(subcon)
+        if bulk is None:
+            return None
+        order, char, length = bulk
+        fname = f"parse_array_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                count = {count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count, ))
+                items = struct.unpack("{order}%d{char}" % (count, ), stream_read(io, count*{length}, '(parsing)'))
+                return ListContainer({'' if discard else 'items'})
+        """)
+        return f"{fname}(io, this)"
+
+    @staticmethod
+    def _emitbulkbuild(code, count, subcon, discard):
+        bulk = Array._emitbulkfield(subcon)
+        if bulk is None:
+            return None
+        order, char, length = bulk
+        fname = f"build_array_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                count = {count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count, ))
+                if not len(obj) == count:
+                    raise RangeError("expected %d elements, found %d" % (count, len(obj)))
+                try:
+                    data = struct.pack("{order}%d{char}" % (count, ), *obj)
+                except Exception:
+                    raise FormatFieldError("struct %r error during building, given value %r" % ({repr(order + char)}, obj))
+                io.write(data)
+                return ListContainer({'' if discard else 'obj'})
+        """)
+        return f"{fname}(obj, io, this)"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.count, self.subcon)
+
     def _emitparse(self, code):
+        bulk = self._emitbulkparse(code, self.count, self.subcon, self.discard)
+        if bulk is not None:
+            return bulk
         return f"ListContainer(({self.subcon._compileparse(code)}) for i in range({self.count}))"
 
     def _emitbuild(self, code):
+        bulk = self._emitbulkbuild(code, self.count, self.subcon, self.discard)
+        if bulk is not None:
+            return bulk
         return f"ListContainer(reuse(obj[i], lambda obj: ({self.subcon._compilebuild(code)})) for i in range({self.count}))"
 
     def _emitfulltype(self, ksy, bitwise):
@@ -2770,6 +4265,10 @@ class Renamed(Subconstruct):
         path += " -> %s" % (self.name,)
         return self.subcon._parsereport(stream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        path += " -> %s" % (self.name,)
+        return await self.subcon._parsereportasync(stream, context, path)
+
     def _build(self, obj, stream, context, path):
         path += " -> %s" % (self.name,)
         return self.subcon._build(obj, stream, context, path)
@@ -2778,12 +4277,24 @@ class Renamed(Subconstruct):
         path += " -> %s" % (self.name,)
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         return self.subcon._compileparse(code)
 
     def _emitbuild(self, code):
         return self.subcon._compilebuild(code)
 
+    def _emitfixedparse(self, code):
+        return self.subcon._emitfixedparse(code)
+
+    def _emitbitfield(self):
+        return self.subcon._emitbitfield()
+
     def _emitseq(self, ksy, bitwise):
         return self.subcon._compileseq(ksy, bitwise)
 
@@ -2854,12 +4365,13 @@ class Const(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
-        code.append(f"""
-            def parse_const(value, expected):
-                if not value == expected: raise ConstError
-                return value
-        """)
         return f"parse_const({self.subcon._compileparse(code)}, {repr(self.value)})"
 
     def _emitbuild(self, code):
@@ -2868,6 +4380,12 @@ class Const(Subconstruct):
         else:
             return f"reuse({repr(self.value)}, lambda obj: {self.subcon._compilebuild(code)})"
 
+    def _emitfixedparse(self, code):
+        order, fmt, value = self.subcon._emitfixedparse(code)
+        if value is None:
+            raise NotImplementedError
+        return order, fmt, lambda item: f"parse_const({value(item)}, {repr(self.value)})"
+
     def _emitfulltype(self, ksy, bitwise):
         data = self.subcon.build(self.value)
         return dict(contents=list(data))
@@ -2921,6 +4439,12 @@ class Computed(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.func)
+
     def _emitparse(self, code):
         return repr(self.func)
 
@@ -2969,6 +4493,9 @@ class Index(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
 
 class Rebuild(Subconstruct):
     r"""
@@ -3004,6 +4531,9 @@ class Rebuild(Subconstruct):
         obj = evaluate(self.func, context)
         return self.subcon._build(obj, stream, context, path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         return self.subcon._compileparse(code)
 
@@ -3060,6 +4590,9 @@ class Default(Subconstruct):
         obj = evaluate(self.value, context) if obj is None else obj
         return self.subcon._build(obj, stream, context, path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
     def _emitparse(self, code):
         return self.subcon._compileparse(code)
 
@@ -3112,6 +4645,12 @@ class Check(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.func)
+
     def _emitparse(self, code):
         code.append(f"""
             def parse_check(condition):
@@ -3242,6 +4781,17 @@ class FocusedSeq(Construct):
                 finalret = parseret
         return finalret
 
+    async def _parseasync(self, stream, context, path):
+        context = context.create_child(_io=stream, _subcons=self._subcons)
+        parsebuildfrom = evaluate(self.parsebuildfrom, context)
+        for i,sc in enumerate(self.subcons):
+            parseret = await sc._parsereportasync(stream, context, path)
+            if sc.name:
+                context[sc.name] = parseret
+            if sc.name == parsebuildfrom:
+                finalret = parseret
+        return finalret
+
     def _build(self, obj, stream, context, path):
         context = context.create_child(_io=stream, _subcons=self._subcons)
         parsebuildfrom = evaluate(self.parsebuildfrom, context)
@@ -3260,24 +4810,46 @@ class FocusedSeq(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        return Struct._emitsizeofsum(code, self.subcons)
+
+    def _emitreads(self, code):
+        return None if self._emitfocus(code) is None else set()
+
+    def _emitfocus(self, code):
+        # index of parsed member, if members read nothing but their siblings and so only need those in a plain dict
+        reads = code.contextReads(*self.subcons)
+        names = [sc.name for sc in self.subcons]
+        if reads is None or not isinstance(self.parsebuildfrom, str) or self.parsebuildfrom not in names:
+            return None
+        return reads, len(names) - 1 - names[::-1].index(self.parsebuildfrom)
+
     def _emitparse(self, code):
         fname = f"parse_focusedseq_{code.allocateId()}"
+        parsed = [sc._compileparse(code) for sc in self.subcons]
+        focus = self._emitfocus(code)
         block = f"""
             def {fname}(io, this):
                 result = []
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
         """
-        for sc in self.subcons:
+        if focus is None:
+            block += f"""
+                this = this.create_child(_io=io)
+            """
+        else:
             block += f"""
-                result.append({sc._compileparse(code)})
+                this = {{}}
             """
-            if sc.name:
+        for sc, value in zip(self.subcons, parsed):
+            block += f"""
+                result.append({value})
+            """
+            if sc.name and (focus is None or sc.name in focus[0]):
                 block += f"""
                 this[{repr(sc.name)}] = result[-1]
                 """
         block += f"""
-                return this[{repr(self.parsebuildfrom)}]
+                return {f'this[{repr(self.parsebuildfrom)}]' if focus is None else f'result[{focus[1]}]'}
         """
         code.append(block)
         return f"{fname}(io, this)"
@@ -3286,8 +4858,7 @@ class FocusedSeq(Construct):
         fname = f"build_focusedseq_{code.allocateId()}"
         block = f"""
             def {fname}(obj, io, this):
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
+                this = this.create_child(_io=io)
                 try:
                     this[{repr(self.parsebuildfrom)}] = obj
                     finalobj = obj
@@ -3406,7 +4977,7 @@ class NamedTuple(Adapter):
 
     def _decode(self, obj, context, path):
         if isinstance(self.subcon, Struct):
-            del obj["_io"]
+            obj.pop("_io", None)
             return self.factory(**obj)
         if isinstance(self.subcon, (Sequence,Array,GreedyRange)):
             return self.factory(*obj)
@@ -3749,8 +5320,8 @@ class Union(Construct):
         fname = "parse_union_%s" % code.allocateId()
         block = """
             def %s(io, this):
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
+                result = Container()
+                this = this.create_child(_io=io)
                 fallback = io.tell()
         """ % (fname, )
         if isinstance(self.parsefrom, type(None)):
@@ -3770,7 +5341,7 @@ class Union(Construct):
         for i,sc in enumerate(self.subcons):
             block += """
                 %s%s
-            """ % ("this[%r] = " % sc.name if sc.name else "", sc._compileparse(code))
+            """ % ("result[%r] = this[%r] = " % (sc.name, sc.name) if sc.name else "", sc._compileparse(code))
             if i == index and not skipforward:
                 block += """
                 forward = io.tell()
@@ -3788,9 +5359,7 @@ class Union(Construct):
                 io.seek(forward)
             """
         block += """
-                del this['_']
-                del this['_index']
-                return this
+                return result
         """
         code.append(block)
         return "%s(io, this)" % (fname,)
@@ -3799,8 +5368,7 @@ class Union(Construct):
         fname = f"build_union_{code.allocateId()}"
         block = f"""
             def {fname}(obj, io, this):
-                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
-                this['_root'] = this['_'].get('_root', this)
+                this = this.create_child(_io=io)
                 this.update(obj)
                 objdict = obj
         """
@@ -3968,6 +5536,11 @@ class IfThenElse(Construct):
         sc = self.thensubcon if condfunc else self.elsesubcon
         return sc._parsereport(stream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        condfunc = evaluate(self.condfunc, context)
+        sc = self.thensubcon if condfunc else self.elsesubcon
+        return await sc._parsereportasync(stream, context, path)
+
     def _build(self, obj, stream, context, path):
         condfunc = evaluate(self.condfunc, context)
         sc = self.thensubcon if condfunc else self.elsesubcon
@@ -3978,6 +5551,16 @@ class IfThenElse(Construct):
         sc = self.thensubcon if condfunc else self.elsesubcon
         return sc._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        thensize = self.thensubcon._compilesizeof(code)
+        elsesize = self.elsesubcon._compilesizeof(code)
+        if thensize == elsesize and thensize.isdigit():
+            return thensize
+        return f"(({thensize}) if ({repr(self.condfunc)}) else ({elsesize}))"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.condfunc, self.thensubcon, self.elsesubcon)
+
     def _emitparse(self, code):
         return "((%s) if (%s) else (%s))" % (self.thensubcon._compileparse(code), self.condfunc, self.elsesubcon._compileparse(code), )
 
@@ -4035,6 +5618,11 @@ class Switch(Construct):
         sc = self.cases.get(keyfunc, self.default)
         return sc._parsereport(stream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        keyfunc = evaluate(self.keyfunc, context)
+        sc = self.cases.get(keyfunc, self.default)
+        return await sc._parsereportasync(stream, context, path)
+
     def _build(self, obj, stream, context, path):
         keyfunc = evaluate(self.keyfunc, context)
         sc = self.cases.get(keyfunc, self.default)
@@ -4049,6 +5637,9 @@ class Switch(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.keyfunc, self.default, *self.cases.values())
+
     def _emitparse(self, code):
         fname = f"switch_cases_{code.allocateId()}"
         code.append(f"{fname} = {{}}")
@@ -4240,12 +5831,32 @@ class Padded(Subconstruct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        if isinstance(self.length, int):
+            if self.length < 0:
+                raise NotImplementedError
+            return f"{self.length}"
+        return f"checksize(({self.length}), PaddingError, 'length cannot be negative')"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.length, self.subcon)
+
     def _emitparse(self, code):
         return f"({self.subcon._compileparse(code)}, io.read(({self.length})-({self.subcon.sizeof()}) ))[0]"
 
     def _emitbuild(self, code):
         return f"({self.subcon._compilebuild(code)}, io.write({repr(self.pattern)}*(({self.length})-({self.subcon.sizeof()})) ))[0]"
 
+    def _emitfixedparse(self, code):
+        if not isinstance(self.length, int) or self.length < 0 or self.subcon is not Pass:
+            raise NotImplementedError
+        return None, f"{self.length}x", None
+
+    def _emitbitfield(self):
+        if not isinstance(self.length, int) or self.length < 1 or self.subcon is not Pass or self.pattern != b"\x00":
+            raise NotImplementedError
+        return self.length, "pad", False
+
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=self.length, type=self.subcon._compileprimitivetype(ksy, bitwise))
 
@@ -4413,6 +6024,9 @@ class Pointer(Subconstruct):
         stream_seek(stream, fallback, 0, path)
         return obj
 
+    async def _parseasync(self, stream, context, path):
+        raise StreamError("Pointer needs seeking, it cannot be parsed asynchronously", path=path)
+
     def _build(self, obj, stream, context, path):
         offset = evaluate(self.offset, context)
         stream = evaluate(self.stream, context) or stream
@@ -4425,6 +6039,9 @@ class Pointer(Subconstruct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         code.append(f"""
             def parse_pointer(io, offset, func):
@@ -4491,12 +6108,18 @@ class Peek(Subconstruct):
         finally:
             stream_seek(stream, fallback, 0, path)
 
+    async def _parseasync(self, stream, context, path):
+        raise StreamError("Peek needs seeking, it cannot be parsed asynchronously", path=path)
+
     def _build(self, obj, stream, context, path):
         return obj
 
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         code.append("""
             def parse_peek(io, func):
@@ -4647,6 +6270,9 @@ class Tell(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         return "io.tell()"
 
@@ -4684,6 +6310,12 @@ class Pass(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
+    def _emitreads(self, code):
+        return set()
+
     def _emitparse(self, code):
         return "None"
 
@@ -4719,6 +6351,10 @@ class Terminated(Construct):
         if stream.read(1):
             raise TerminatedError("expected end of stream", path=path)
 
+    async def _parseasync(self, stream, context, path):
+        if await stream.read(1):
+            raise TerminatedError("expected end of stream", path=path)
+
     def _build(self, obj, stream, context, path):
         return obj
 
@@ -4827,7 +6463,7 @@ def BitsSwapped(subcon):
         size = subcon.sizeof()
         return Transformed(subcon, swapbitsinbytes, size, swapbitsinbytes, size)
     except SizeofError:
-        return Restreamed(subcon, swapbitsinbytes, 1, swapbitsinbytes, 1, lambda n: n)
+        return Restreamed(subcon, swapbitsinbytes, 1, swapbitsinbytes, 1, lambda n: n, bulk=True)
 
 
 class Prefixed(Subconstruct):
@@ -4869,7 +6505,25 @@ class Prefixed(Subconstruct):
         substream = BytesIOWithOffsets.from_reading(stream, length, path)
         return self.subcon._parsereport(substream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        length = await self.lengthfield._parsereportasync(stream, context, path)
+        if self.includelength:
+            length -= self.lengthfield._sizeof(context, path)
+        offset = stream.tell()
+        data = await stream_read_async(stream, length, path)
+        return self.subcon._parsereport(BytesIOWithOffsets(data, stream, offset), context, path)
+
     def _build(self, obj, stream, context, path):
+        if type(stream) is ChunkedBytesIO:
+            # splices built chunks instead of copying them
+            stream2 = ChunkedBytesIO()
+            buildret = self.subcon._build(obj, stream2, context, path)
+            length = len(stream2)
+            if self.includelength:
+                length += self.lengthfield._sizeof(context, path)
+            self.lengthfield._build(length, stream, context, path)
+            stream.extend(stream2)
+            return buildret
         stream2 = io.BytesIO()
         buildret = self.subcon._build(obj, stream2, context, path)
         data = stream2.getvalue()
@@ -4883,6 +6537,13 @@ class Prefixed(Subconstruct):
     def _sizeof(self, context, path):
         return self.lengthfield._sizeof(context, path) + self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        lengthsize = self.lengthfield._compilesizeof(code)
+        size = self.subcon._compilesizeof(code)
+        if lengthsize.isdigit() and size.isdigit():
+            return f"{int(lengthsize) + int(size)}"
+        return f"({lengthsize}) + ({size})"
+
     def _actualsize(self, stream, context, path):
         position1 = stream_tell(stream, path)
         length = self.lengthfield._parse(stream, context, path)
@@ -4891,9 +6552,30 @@ class Prefixed(Subconstruct):
         position2 = stream_tell(stream, path)
         return (position2-position1) + length
 
+    def _emitreads(self, code):
+        return code.contextReads(self.lengthfield, self.subcon)
+
     def _emitparse(self, code):
         sub = self.lengthfield.sizeof() if self.includelength else 0
-        return f"restream(io.read(({self.lengthfield._compileparse(code)})-({sub})), lambda io: ({self.subcon._compileparse(code)}))"
+        return f"restream(stream_read(io, ({self.lengthfield._compileparse(code)})-({sub}), '(parsing)'), lambda io: ({self.subcon._compileparse(code)}))"
+
+    def _emitbuild(self, code):
+        fname = f"build_prefixed_{code.allocateId()}"
+        sub = self.lengthfield.sizeof() if self.includelength else 0
+        block = f"""
+            def {fname}(obj, io, this):
+                outer = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                data = io.getvalue()
+                io = outer
+                obj = len(data) + ({sub})
+                {self.lengthfield._compilebuild(code)}
+                io.write(data)
+                return buildret
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
 
     def _emitseq(self, ksy, bitwise):
         return [
@@ -4930,10 +6612,20 @@ def PrefixedArray(countfield, subcon):
     )
 
     def _emitparse(code):
+        bulk = Array._emitbulkparse(code, countfield._compileparse(code), subcon, False)
+        if bulk is not None:
+            return bulk
         return "ListContainer((%s) for i in range(%s))" % (subcon._compileparse(code), countfield._compileparse(code), )
     macro._emitparse = _emitparse
 
+    def _emitreads(code):
+        return code.contextReads(countfield, subcon)
+    macro._emitreads = _emitreads
+
     def _emitbuild(code):
+        bulk = Array._emitbulkbuild(code, "len(obj)", subcon, False)
+        if bulk is not None:
+            return f"(reuse(len(obj), lambda obj: {countfield._compilebuild(code)}), {bulk})[1]"
         return f"(reuse(len(obj), lambda obj: {countfield._compilebuild(code)}), list({subcon._compilebuild(code)} for obj in obj), obj)[2]"
     macro._emitbuild = _emitbuild
 
@@ -4991,10 +6683,28 @@ class FixedSized(Subconstruct):
         substream = BytesIOWithOffsets.from_reading(stream, length, path)
         return self.subcon._parsereport(substream, context, path)
 
+    async def _parseasync(self, stream, context, path):
+        length = evaluate(self.length, context)
+        if length < 0:
+            raise PaddingError("length cannot be negative", path=path)
+        offset = stream.tell()
+        data = await stream_read_async(stream, length, path)
+        return self.subcon._parsereport(BytesIOWithOffsets(data, stream, offset), context, path)
+
     def _build(self, obj, stream, context, path):
         length = evaluate(self.length, context)
         if length < 0:
             raise PaddingError("length cannot be negative", path=path)
+        if type(stream) is ChunkedBytesIO:
+            # splices built chunks instead of copying them
+            stream2 = ChunkedBytesIO()
+            buildret = self.subcon._build(obj, stream2, context, path)
+            pad = length - len(stream2)
+            if pad < 0:
+                raise PaddingError("subcon build %d bytes but was allowed only %d" % (len(stream2), length), path=path)
+            stream.extend(stream2)
+            stream_write(stream, bytes(pad), pad, path)
+            return buildret
         stream2 = io.BytesIO()
         buildret = self.subcon._build(obj, stream2, context, path)
         data = stream2.getvalue()
@@ -5011,8 +6721,48 @@ class FixedSized(Subconstruct):
             raise PaddingError("length cannot be negative", path=path)
         return length
 
+    def _emitsizeof(self, code):
+        if isinstance(self.length, int):
+            if self.length < 0:
+                raise NotImplementedError
+            return f"{self.length}"
+        return f"checksize(({self.length}), PaddingError, 'length cannot be negative')"
+
+    def _emitreads(self, code):
+        return code.contextReads(self.length, self.subcon)
+
     def _emitparse(self, code):
-        return f"restream(io.read({self.length}), lambda io: ({self.subcon._compileparse(code)}))"
+        fname = f"parse_fixedsized_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                length = {self.length}
+                if length < 0:
+                    raise PaddingError("length cannot be negative")
+                return restream(stream_read(io, length, '(parsing)'), lambda io: ({self.subcon._compileparse(code)}))
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        fname = f"build_fixedsized_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                length = {self.length}
+                if length < 0:
+                    raise PaddingError("length cannot be negative")
+                outer = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                data = io.getvalue()
+                pad = length - len(data)
+                if pad < 0:
+                    raise PaddingError("subcon build %d bytes but was allowed only %d" % (len(data), length))
+                outer.write(data)
+                outer.write(bytes(pad))
+                return buildret
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
 
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=repr(self.length).replace("this.",""), **self.subcon._compilefulltype(ksy, bitwise))
@@ -5022,7 +6772,7 @@ class NullTerminated(Subconstruct):
     r"""
     Restricts parsing to bytes preceding a null byte.
 
-    Parsing reads one byte at a time and accumulates it with previous bytes. When term was found, (by default) consumes but discards the term. When EOF was found, (by default) raises same StreamError exception. Then subcon is parsed using new BytesIO made with said data. Building builds the subcon and then writes the term. Size is undefined.
+    Parsing scans the stream for the term in chunks and seeks back to just after it (streams that are not seekable are read one term-sized unit at a time instead). When term was found, (by default) consumes but discards the term. When EOF was found, (by default) raises same StreamError exception. Then subcon is parsed using new BytesIO made with said data. Building builds the subcon and then writes the term. Size is undefined.
 
     The term can be multiple bytes, to support string classes with UTF16/32 encodings for example. Be warned however: as reported in Issue 1046, the data read must be a multiple of the term length and the term must start at a unit boundary, otherwise strange things happen when parsing.
 
@@ -5057,25 +6807,68 @@ class NullTerminated(Subconstruct):
         unit = len(term)
         if unit < 1:
             raise PaddingError("NullTerminated term must be at least 1 byte", path=path)
-        data = b''
         offset = stream_tell(stream, path)
+        data = self._scan(stream, offset, term, self.include, self.consume, self.require, path)
+        substream = BytesIOWithOffsets(data, stream, offset)
+        return self.subcon._parsereport(substream, context, path)
+
+    @staticmethod
+    def _scan(stream, offset, term, include, consume, require, path):
+        # also called from compiled code
+        seekable = getattr(stream, "seekable", None)
+        if seekable is not None and seekable():
+            return NullTerminated._scanchunks(stream, offset, term, len(term), include, consume, require, path)
+        else:
+            return NullTerminated._scanunits(stream, term, len(term), include, consume, require, path)
+
+    @staticmethod
+    def _scanchunks(stream, offset, term, unit, include, consume, require, path):
+        # reads chunks (multiples of unit, so aligned terms cannot straddle them), then seeks back to just after the term
+        chunks = []
+        scanned = 0
+        chunksize = 64 * unit
+        while True:
+            try:
+                chunk = stream.read(chunksize)
+            except Exception:
+                raise StreamError("stream.read() failed, requested %s bytes" % (chunksize,), path=path)
+            index = chunk.find(term)
+            while index > 0 and index % unit:
+                index = chunk.find(term, index - index % unit + unit)
+            if index >= 0:
+                chunks.append(chunk[:index + unit] if include else chunk[:index])
+                position = offset + scanned + index + (unit if consume else 0)
+                stream_seek(stream, position, io.SEEK_SET, path)
+                return b"".join(chunks)
+            if len(chunk) < chunksize:
+                if require:
+                    raise StreamError("stream read less than specified amount, terminator %r not found before EOF" % (term,), path=path)
+                chunks.append(chunk[:len(chunk) - len(chunk) % unit])
+                return b"".join(chunks)
+            chunks.append(chunk)
+            scanned += chunksize
+            chunksize = min(chunksize * 4, 65536 * unit)
+
+    @staticmethod
+    def _scanunits(stream, term, unit, include, consume, require, path):
+        # for streams that cannot seek back, reads one unit at a time
+        data = bytearray()
         while True:
             try:
                 b = stream_read(stream, unit, path)
             except StreamError:
-                if self.require:
+                if require:
                     raise
                 else:
                     break
             if b == term:
-                if self.include:
+                if include:
                     data += b
-                if not self.consume:
+                if not consume:
                     stream_seek(stream, -unit, 1, path)
                 break
             data += b
-        substream = BytesIOWithOffsets(data, stream, offset)
-        return self.subcon._parsereport(substream, context, path)
+        return bytes(data)
 
     def _build(self, obj, stream, context, path):
         buildret = self.subcon._build(obj, stream, context, path)
@@ -5085,6 +6878,17 @@ class NullTerminated(Subconstruct):
     def _sizeof(self, context, path):
         raise SizeofError(path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
+    def _emitparse(self, code):
+        if len(self.term) < 1:
+            raise NotImplementedError
+        return f"restream(NullTerminated._scan(io, io.tell(), {repr(self.term)}, {self.include}, {self.consume}, {self.require}, '(parsing)'), lambda io: ({self.subcon._compileparse(code)}))"
+
+    def _emitbuild(self, code):
+        return f"({self.subcon._compilebuild(code)}, io.write({repr(self.term)}))[0]"
+
     def _emitfulltype(self, ksy, bitwise):
         if len(self.term) > 1:
             raise NotImplementedError
@@ -5123,26 +6927,41 @@ class NullStripped(Subconstruct):
         if unit < 1:
             raise PaddingError("NullStripped pad must be at least 1 byte", path=path)
         offset = stream_tell(stream, path)
-        data = stream_read_entire(stream, path)
-        if unit == 1:
-            data = data.rstrip(pad)
-        else:
-            tailunit = len(data) % unit
-            end = len(data)
-            if tailunit and data[-tailunit:] == pad[:tailunit]:
-                end -= tailunit
-            while end-unit >= 0 and data[end-unit:end] == pad:
-                end -= unit
-            data = data[:end]
+        data = self._strip(stream_read_entire(stream, path), pad)
         substream = BytesIOWithOffsets(data, stream, offset)
         return self.subcon._parsereport(substream, context, path)
 
+    @staticmethod
+    def _strip(data, pad):
+        # also called from compiled code
+        unit = len(pad)
+        if unit == 1:
+            return data.rstrip(pad)
+        tailunit = len(data) % unit
+        end = len(data)
+        if tailunit and data[-tailunit:] == pad[:tailunit]:
+            end -= tailunit
+        while end-unit >= 0 and data[end-unit:end] == pad:
+            end -= unit
+        return data[:end]
+
     def _build(self, obj, stream, context, path):
         return self.subcon._build(obj, stream, context, path)
 
     def _sizeof(self, context, path):
         raise SizeofError(path=path)
 
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
+    def _emitparse(self, code):
+        if len(self.pad) < 1:
+            raise NotImplementedError
+        return f"restream(NullStripped._strip(io.read(), {repr(self.pad)}), lambda io: ({self.subcon._compileparse(code)}))"
+
+    def _emitbuild(self, code):
+        return self.subcon._compilebuild(code)
+
     def _emitfulltype(self, ksy, bitwise):
         if len(self.pad) > 1:
             raise NotImplementedError
@@ -5197,6 +7016,9 @@ class RestreamData(Subconstruct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         return "restream(%r, lambda io: %s)" % (self.datafunc, self.subcon._compileparse(code), )
 
@@ -5254,7 +7076,7 @@ class Transformed(Subconstruct):
         return self.subcon._parsereport(io.BytesIO(data), context, path)
 
     def _build(self, obj, stream, context, path):
-        stream2 = io.BytesIO()
+        stream2 = ChunkedBytesIO() if type(stream) is ChunkedBytesIO else io.BytesIO()
         buildret = self.subcon._build(obj, stream2, context, path)
         data = stream2.getvalue()
         data = self.encodefunc(data)
@@ -5271,6 +7093,134 @@ class Transformed(Subconstruct):
             return self.encodeamount
         raise SizeofError(path=path)
 
+    def _emitsizeof(self, code):
+        if self.decodeamount is None or self.decodeamount != self.encodeamount:
+            raise NotImplementedError
+        return f"{self.decodeamount}"
+
+    def _bitfields(self):
+        # static layouts of bit fields inside Bitwise, returns whether subcon is a Struct, fields with their shifts, and size in bytes
+        if not (self.decodefunc is bytes2bits and self.encodefunc is bits2bytes):
+            return None
+        isstruct = type(self.subcon) is Struct
+        fields = []
+        offset = 0
+        for sc in (self.subcon.subcons if isstruct else [self.subcon]):
+            try:
+                length, kind, signed = sc._emitbitfield()
+            except NotImplementedError:
+                return None
+            if isstruct and not sc.name and kind != "pad":
+                return None
+            offset += length
+            fields.append((sc, length, kind, signed, offset))
+        if offset % 8:
+            return None
+        return isstruct, [(sc, length, kind, signed, offset - end) for sc,length,kind,signed,end in fields], offset//8
+
+    def _emitreads(self, code):
+        return code.contextReads(self.subcon)
+
+    def _emitparse(self, code):
+        layout = self._bitfields()
+        if layout is not None:
+            # one integer read and shifts, instead of expanding bits into bytes
+            isstruct, fields, size = layout
+            values = []
+            for sc, length, kind, signed, shift in fields:
+                mask = (1 << length) - 1
+                if kind == "pad":
+                    value = "None"
+                elif kind == "flag":
+                    value = f"(bits >> {shift} & 1 == 1)"
+                elif signed:
+                    value = f"((bits >> {shift} & {mask}) ^ {1 << (length-1)}) - {1 << (length-1)}"
+                else:
+                    value = f"(bits >> {shift} & {mask})"
+                values.append((sc, value))
+            if isstruct:
+                result = "Container({%s})" % ", ".join(f"{repr(sc.name)}: {value}" for sc,value in values if sc.name)
+            else:
+                result = values[0][1]
+            fname = f"parse_bitwise_{code.allocateId()}"
+            code.append(f"""
+                def {fname}(io, this):
+                    bits = int.from_bytes(stream_read(io, {size}, '(parsing)'), 'big')
+                    return {result}
+            """)
+            return f"{fname}(io, this)"
+        decodefunc = libfunction(self.decodefunc)
+        if decodefunc is None:
+            raise NotImplementedError
+        if self.decodeamount is None:
+            data = "io.read()"
+        else:
+            data = f"stream_read(io, {self.decodeamount}, '(parsing)')"
+        return f"restream({decodefunc}({data}), lambda io: ({self.subcon._compileparse(code)}))"
+
+    def _emitbuild(self, code):
+        layout = self._bitfields()
+        if layout is not None:
+            isstruct, fields, size = layout
+            fname = f"build_bitwise_{code.allocateId()}"
+            block = f"""
+                def {fname}(obj, io, this):
+                    bits = 0
+            """
+            for sc, length, kind, signed, shift in fields:
+                if kind == "pad":
+                    continue
+                if isstruct:
+                    block += f"""
+                    value = {f'obj.get({repr(sc.name)}, None)' if sc.flagbuildnone else f'obj[{repr(sc.name)}]'}
+                    """
+                else:
+                    block += f"""
+                    value = obj
+                    """
+                if kind == "flag":
+                    block += f"""
+                    if value:
+                        bits |= {1 << shift}
+                    """
+                else:
+                    lo, hi = (-(1 << (length-1)), (1 << (length-1)) - 1) if signed else (0, (1 << length) - 1)
+                    block += f"""
+                    if not isinstance(value, int):
+                        raise IntegerError("value %s is not an integer" % (value, ))
+                    if not {lo} <= value <= {hi}:
+                        raise IntegerError("number %s is out of range (min={lo}, max={hi})" % (value, ))
+                    bits |= (value & {(1 << length) - 1}) << {shift}
+                    """
+            block += f"""
+                    io.write(bits.to_bytes({size}, 'big'))
+                    return obj
+            """
+            code.append(block)
+            return f"{fname}(obj, io, this)"
+        encodefunc = libfunction(self.encodefunc)
+        if encodefunc is None:
+            raise NotImplementedError
+        fname = f"build_transformed_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                outer = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                data = {encodefunc}(io.getvalue())
+        """
+        if self.encodeamount is not None:
+            block += f"""
+                if len(data) != {self.encodeamount}:
+                    raise StreamError("encoding transformation produced wrong amount of bytes, %s instead of expected {self.encodeamount}" % (len(data), ))
+            """
+        block += f"""
+                outer.write(data)
+                return buildret
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
+
 
 class Restreamed(Subconstruct):
     r"""
@@ -5288,32 +7238,34 @@ class Restreamed(Subconstruct):
     :param encoder: bytes-to-bytes function, used on data chunks when building
     :param encoderunit: integer, encoder takes chunks of this size
     :param sizecomputer: function that computes amount of bytes outputed
+    :param bulk: optional, bool, if decoder and encoder can process many units in a single call (concatenated units map onto concatenated outputs), default is False
 
     Can propagate any exception from the lambda, possibly non-ConstructError.
     Can also raise arbitrary exceptions in RestreamedBytesIO implementation.
 
     Example::
 
-        Bitwise  <--> Restreamed(subcon, bits2bytes, 8, bytes2bits, 1, lambda n: n//8)
-        Bytewise <--> Restreamed(subcon, bytes2bits, 1, bits2bytes, 8, lambda n: n*8)
+        Bitwise  <--> Restreamed(subcon, bits2bytes, 8, bytes2bits, 1, lambda n: n//8, bulk=True)
+        Bytewise <--> Restreamed(subcon, bytes2bits, 1, bits2bytes, 8, lambda n: n*8, bulk=True)
     """
 
-    def __init__(self, subcon, decoder, decoderunit, encoder, encoderunit, sizecomputer):
+    def __init__(self, subcon, decoder, decoderunit, encoder, encoderunit, sizecomputer, bulk=False):
         super().__init__(subcon)
         self.decoder = decoder
         self.decoderunit = decoderunit
         self.encoder = encoder
         self.encoderunit = encoderunit
         self.sizecomputer = sizecomputer
+        self.bulk = bulk
 
     def _parse(self, stream, context, path):
-        stream2 = RestreamedBytesIO(stream, self.decoder, self.decoderunit, self.encoder, self.encoderunit)
+        stream2 = RestreamedBytesIO(stream, self.decoder, self.decoderunit, self.encoder, self.encoderunit, self.bulk)
         obj = self.subcon._parsereport(stream2, context, path)
         stream2.close()
         return obj
 
     def _build(self, obj, stream, context, path):
-        stream2 = RestreamedBytesIO(stream, self.decoder, self.decoderunit, self.encoder, self.encoderunit)
+        stream2 = RestreamedBytesIO(stream, self.decoder, self.decoderunit, self.encoder, self.encoderunit, self.bulk)
         buildret = self.subcon._build(obj, stream2, context, path)
         stream2.close()
         return obj
@@ -5376,7 +7328,7 @@ class ProcessXor(Subconstruct):
             raise StringError("ProcessXor needs integer or bytes pad", path=path)
         if isinstance(pad, bytes) and len(pad) == 1:
             pad = byte2int(pad)
-        stream2 = io.BytesIO()
+        stream2 = ChunkedBytesIO() if type(stream) is ChunkedBytesIO else io.BytesIO()
         buildret = self.subcon._build(obj, stream2, context, path)
         data = stream2.getvalue()
         if isinstance(pad, int):
@@ -5391,6 +7343,9 @@ class ProcessXor(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
 
 class ProcessRotateLeft(Subconstruct):
     r"""
@@ -5499,6 +7454,9 @@ class ProcessRotateLeft(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
 
 class Checksum(Construct):
     r"""
@@ -5837,6 +7795,9 @@ class Rebuffered(Subconstruct):
 
     :param subcon: Construct instance, subcon which will operate on the buffered stream
     :param tailcutoff: optional, integer, amount of bytes kept in buffer, by default buffers everything
+    :param eoferror: optional, bool, raise StreamError when underlying stream reaches EOF instead of waiting for more data, default is False
+
+    :raises StreamError: eoferror is set and underlying stream reached EOF
 
     Can also raise arbitrary exceptions in its implementation.
 
@@ -5845,9 +7806,9 @@ class Rebuffered(Subconstruct):
         Rebuffered(..., tailcutoff=1024).parse_stream(nonseekable_stream)
     """
 
-    def __init__(self, subcon, tailcutoff=None):
+    def __init__(self, subcon, tailcutoff=None, eoferror=False):
         super().__init__(subcon)
-        self.stream2 = RebufferedBytesIO(None, tailcutoff=tailcutoff)
+        self.stream2 = RebufferedBytesIO(None, tailcutoff=tailcutoff, eoferror=eoferror)
 
     def _parse(self, stream, context, path):
         self.stream2.substream = stream
@@ -5858,6 +7819,134 @@ class Rebuffered(Subconstruct):
         return self.subcon._build(obj, self.stream2, context, path)
 
 
+class _IncrementalBytesIO(object):
+    """Used internally by IncrementalParser. Reads from a memoryview of the buffer without copying all of it, and remembers the furthest offset that any read asked for, so a parse that ran out of data tells how much data it needs. Reads return bytes, so records do not refer to the buffer."""
+
+    def __init__(self, view, offset):
+        self.view = view
+        self.position = offset
+        self.wanted = 0
+
+    def read(self, size=-1):
+        start = self.position
+        if size is None or size < 0:
+            end = len(self.view)
+        else:
+            end = start + size
+            if end > self.wanted:
+                self.wanted = end
+        data = bytes(self.view[start:end])
+        self.position = start + len(data)
+        return data
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            position = offset
+        elif whence == 1:
+            position = self.position + offset
+        elif whence == 2:
+            position = len(self.view) + offset
+        else:
+            raise ValueError("invalid whence (%r, should be 0, 1 or 2)" % (whence,))
+        if position < 0:
+            raise ValueError("negative seek value %d" % (position,))
+        self.position = position
+        return position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        # NullTerminated scans in chunks on seekable streams, and a chunk that overshoots the buffered data would make the parser wait for more data than the record needs
+        return False
+
+
+class IncrementalParser(object):
+    r"""
+    Push-style parser for streams of records, like sockets and pipes. Data is fed in arbitrary chunks as it arrives, and every call returns the records that got completed.
+
+    Incomplete records are not re-parsed on every feed. When a record runs out of data, the parser remembers how many bytes the failing read asked for (for example, the length announced by a Prefixed header), and tries again only once that much data is buffered. Records of static size are not attempted until all their bytes arrived. Completed records are dropped from the buffer.
+
+    The subcon must be self-delimiting, like Prefixed or fixed-size constructs or NullTerminated. Greedy constructs would parse whatever happens to be buffered.
+
+    :param subcon: Construct instance, parses a single record
+    :param maxbuffer: optional, integer, maximum amount of bytes buffered for an incomplete record
+    :param \*\*contextkw: context entries, usually empty, passed to parse_stream for every record
+
+    :raises StreamError: incomplete record needs more than maxbuffer bytes
+    :raises StreamError: record failed to parse although enough data was buffered
+
+    Can also raise arbitrary exceptions raised by the subcon.
+
+    Example::
+
+        >>> p = IncrementalParser(Prefixed(Byte, GreedyBytes))
+        >>> p.feed(b"\x03ab")
+        []
+        >>> p.feed(b"c\x01d\x02")
+        [b'abc', b'd']
+        >>> p.feed(b"ef")
+        [b'ef']
+    """
+
+    def __init__(self, subcon, maxbuffer=None, **contextkw):
+        self.subcon = subcon
+        self.maxbuffer = maxbuffer
+        self.contextkw = contextkw
+        self.buffer = bytearray()
+        try:
+            self.recordsize = subcon.sizeof(**contextkw)
+        except SizeofError:
+            self.recordsize = None
+        self.wanted = self.recordsize or 1
+
+    def feed(self, data):
+        r"""
+        Appends data to the buffer and parses all records that are complete.
+
+        :param data: bytes
+        :returns: list of parsed records, possibly empty
+
+        If parsing a record raises, records completed by this call are attached to the exception as its `records` attribute, and are dropped from the buffer along with their data. The failed record stays buffered.
+        """
+        self.buffer += data
+        records = []
+        if len(self.buffer) >= self.wanted:
+            view = memoryview(self.buffer)
+            offset = 0
+            try:
+                while offset < len(view):
+                    if self.recordsize is not None and len(view) - offset < self.recordsize:
+                        self.wanted = self.recordsize
+                        break
+                    stream = _IncrementalBytesIO(view, offset)
+                    try:
+                        obj = self.subcon.parse_stream(stream, **self.contextkw)
+                    except StreamError:
+                        if stream.wanted <= len(view):
+                            raise
+                        self.wanted = stream.wanted - offset
+                        break
+                    if stream.tell() == offset:
+                        raise StreamError("record consumed no data, subcon is not self-delimiting")
+                    records.append(obj)
+                    offset = stream.tell()
+                    self.wanted = self.recordsize or 1
+            except Exception as e:
+                # records completed before the failure are not parsed again by the next feed
+                e.records = records
+                raise
+            finally:
+                view.release()
+                del self.buffer[:offset]
+        if self.maxbuffer is not None and max(len(self.buffer), self.wanted) > self.maxbuffer:
+            raise StreamError("incomplete record needs %d bytes, more than maxbuffer %d" % (max(len(self.buffer), self.wanted), self.maxbuffer))
+        return records
+
+
 #===============================================================================
 # lazy equivalents
 #===============================================================================
@@ -5910,17 +7999,41 @@ class Lazy(Subconstruct):
             obj = obj()
         return self.subcon._build(obj, stream, context, path)
 
+    def _emitparse(self, code):
+        fname = f"parse_lazy_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                offset = io.tell()
+                def execute():
+                    fallback = io.tell()
+                    io.seek(offset)
+                    obj = {self.subcon._compileparse(code)}
+                    io.seek(fallback)
+                    return obj
+                try:
+                    size = {code.lazySize(self.subcon)}
+                except (KeyError, AttributeError):
+                    raise SizeofError("cannot calculate size, key not found in context")
+                io.seek(size, 1)
+                return execute
+        """)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        return f"reuse(obj() if callable(obj) else obj, lambda obj: ({self.subcon._compilebuild(code)}))"
+
 
 class LazyContainer(dict):
     """Used internally."""
 
-    def __init__(self, struct, stream, offsets, values, context, path):
+    def __init__(self, struct, stream, offsets, values, context, path, parsers=None):
         self._struct = struct
         self._stream = stream
         self._offsets = offsets
         self._values = values
         self._context = context
         self._path = path
+        self._parsers = parsers
 
     def __getattr__(self, name):
         if name in self._struct._subconsindexes:
@@ -5933,7 +8046,10 @@ class LazyContainer(dict):
         if index in self._values:
             return self._values[index]
         stream_seek(self._stream, self._offsets[index], 0, self._path) # KeyError
-        parseret = self._struct.subcons[index]._parsereport(self._stream, self._context, self._path)
+        if self._parsers is not None:
+            parseret = self._parsers[index](self._stream, self._context)
+        else:
+            parseret = self._struct.subcons[index]._parsereport(self._stream, self._context, self._path)
         self._values[index] = parseret
         return parseret
 
@@ -6011,6 +8127,54 @@ class LazyStruct(Construct):
             offsets[i+1] = offset
         return LazyContainer(self, stream, offsets, values, context, path)
 
+    def _emitparse(self, code):
+        self._compileinstance(code)
+        parsers = [sc._compileparse(code) for sc in self.subcons]
+        pname = f"parsers_lazystruct_{code.allocateId()}"
+        code.append(f"{pname} = ({''.join(f'lambda io, this: {parser}, ' for parser in parsers)})")
+        fname = f"parse_lazystruct_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                this = this.create_child(_io=io)
+                offset = io.tell()
+                offsets = {{0: offset}}
+                values = {{}}
+        """
+        for i,(sc,parser) in enumerate(zip(self.subcons, parsers)):
+            size = code.lazySize(sc)
+            if size.isdigit():
+                block += f"""
+                offset += {size}
+                io.seek(offset)
+                """
+            else:
+                # fields that cannot be sized get parsed, like in _parse
+                block += f"""
+                try:
+                    offset += {size}
+                    io.seek(offset)
+                except (KeyError, AttributeError, SizeofError):
+                    io.seek(offset)
+                    values[{i}] = {parser}
+                    {f'this[{repr(sc.name)}] = values[{i}]' if sc.name else ''}
+                    offset = io.tell()
+                """
+            block += f"""
+                offsets[{i+1}] = offset
+            """
+        block += f"""
+                io.seek(offset)
+                return LazyContainer(linkedinstances[{id(self)}], io, offsets, values, this, '(parsing)', {pname})
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        return Struct._emitbuild(self, code)
+
+    def _emitsizeof(self, code):
+        return Struct._emitsizeofsum(code, self.subcons)
+
     def _build(self, obj, stream, context, path):
         # exact copy from Struct class
         if obj is None:
@@ -6045,7 +8209,7 @@ class LazyStruct(Construct):
 class LazyListContainer(list):
     """Used internally."""
 
-    def __init__(self, subcon, stream, count, offsets, values, context, path):
+    def __init__(self, subcon, stream, count, offsets, values, context, path, parser=None):
         self._subcon = subcon
         self._stream = stream
         self._count = count
@@ -6053,14 +8217,22 @@ class LazyListContainer(list):
         self._values = values
         self._context = context
         self._path = path
+        self._parser = parser
 
     def __getitem__(self, index):
         if isinstance(index, slice):
             return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index out of range")
         if index in self._values:
             return self._values[index]
-        stream_seek(self._stream, self._offsets[index], 0, self._path) # KeyError
-        parseret = self._subcon._parsereport(self._stream, self._context, self._path)
+        stream_seek(self._stream, self._offsets[index], 0, self._path)
+        if self._parser is not None:
+            parseret = self._parser(self._stream, self._context)
+        else:
+            parseret = self._subcon._parsereport(self._stream, self._context, self._path)
         self._values[index] = parseret
         return parseret
 
@@ -6129,6 +8301,52 @@ class LazyArray(Subconstruct):
             offsets[i+1] = offset
         return LazyListContainer(sc, stream, count, offsets, values, context, path)
 
+    def _emitparse(self, code):
+        parser = self.subcon._compileparse(code)
+        pname = f"parser_lazyarray_{code.allocateId()}"
+        code.append(f"{pname} = lambda io, this: {parser}")
+        size = code.lazySize(self.subcon)
+        fname = f"parse_lazyarray_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                count = {self.count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count, ))
+                offset = io.tell()
+        """
+        if size.isdigit() and int(size) > 0:
+            # offsets of fixed-size elements are computed, not stored
+            block += f"""
+                io.seek(offset + count*{size})
+                return LazyListContainer(None, io, count, range(offset, offset + count*{size}, {size}), {{}}, this, '(parsing)', {pname})
+            """
+        else:
+            block += f"""
+                offsets = {{0: offset}}
+                values = {{}}
+                for i in range(count):
+                    try:
+                        offset += {size}
+                        io.seek(offset)
+                    except (KeyError, AttributeError, SizeofError):
+                        io.seek(offset)
+                        values[i] = {parser}
+                        offset = io.tell()
+                    offsets[i+1] = offset
+                return LazyListContainer(None, io, count, offsets, values, this, '(parsing)', {pname})
+            """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        bulk = Array._emitbulkbuild(code, self.count, self.subcon, False)
+        if bulk is not None:
+            return bulk
+        return f"ListContainer(reuse(obj[i], lambda obj: ({self.subcon._compilebuild(code)})) for i in range({self.count}))"
+
+    def _emitsizeof(self, code):
+        return Array._emitsizeof(self, code)
+
     def _build(self, obj, stream, context, path):
         # exact copy from Array class
         count = self.count
@@ -6153,6 +8371,8 @@ class LazyArray(Subconstruct):
                 count = count(context)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
+        if not 0 <= count:
+            raise SizeofError("invalid count %s" % (count,), path=path)
         return count * self.subcon._sizeof(context, path)
 
 
@@ -6218,6 +8438,27 @@ class LazyBound(Construct):
         sc = self.subconfunc()
         return sc._build(obj, stream, context, path)
 
+    def _emitparse(self, code):
+        # every function gets one generated function, which recursive references call
+        fname = code.boundparsers.get(id(self.subconfunc))
+        if fname is None:
+            fname = code.boundparsers[id(self.subconfunc)] = f"parse_lazybound_{code.allocateId()}"
+            code.append(f"""
+                def {fname}(io, this):
+                    return {self.subconfunc()._compileparse(code)}
+            """)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        fname = code.boundbuilders.get(id(self.subconfunc))
+        if fname is None:
+            fname = code.boundbuilders[id(self.subconfunc)] = f"build_lazybound_{code.allocateId()}"
+            code.append(f"""
+                def {fname}(obj, io, this):
+                    return {self.subconfunc()._compilebuild(code)}
+            """)
+        return f"{fname}(obj, io, this)"
+
 
 #===============================================================================
 # adapters and validators
@@ -30,7 +30,11 @@ __all__ = [
     'ONWINDOWS',
     'PY',
     'PYPY',
+    'Query',
+    'QueryIndex',
     'RebufferedBytesIO',
+    'Record',
+    'recordclass',
     'RestreamedBytesIO',
     'setGlobalPrintFalseFlags',
     'setGlobalPrintFullStrings',
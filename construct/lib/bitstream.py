@@ -1,55 +1,109 @@
 from io import BlockingIOError
+from selectors import DefaultSelector, EVENT_READ
 from time import sleep
 from sys import maxsize
 
 
 class RestreamedBytesIO(object):
+    """Read buffer is bytes with an offset, write buffer is a bytearray. With bulk enabled, all currently needed units are decoded or encoded in a single call, so decoder and encoder must map concatenated units to concatenated outputs. Otherwise they are called once per unit."""
 
-    def __init__(self, substream, decoder, decoderunit, encoder, encoderunit):
+    def __init__(self, substream, decoder, decoderunit, encoder, encoderunit, bulk=False):
         self.substream = substream
         self.encoder = encoder
         self.encoderunit = encoderunit
         self.decoder = decoder
         self.decoderunit = decoderunit
+        self.bulk = bulk
         self.rbuffer = b""
-        self.wbuffer = b""
+        self.rpos = 0
+        self.wbuffer = bytearray()
         self.sincereadwritten = 0
+        self.decodedperunit = None
 
     def read(self, count=None):
-        if count is None:
-            while True:
-                data = self.substream.read(self.decoderunit)
-                if data is None or len(data) == 0:
-                    break
-                self.rbuffer += self.decoder(data)
-            data, self.rbuffer = self.rbuffer, b''
+        if count is None or count < 0:
+            chunks = [self.rbuffer[self.rpos:]]
+            if self.bulk:
+                # whole units are read and decoded in bounded chunks, a trailing partial unit is decoded at EOF
+                size = self.decoderunit * max(1, 64*1024 // self.decoderunit)
+                pending = b""
+                while True:
+                    data = self.substream.read(size)
+                    if data is not None and len(data) == 0:
+                        # substreams like this one keep a short tail buffered when a sized read hits EOF
+                        data = self.substream.read()
+                    if data is None or len(data) == 0:
+                        break
+                    pending += data
+                    complete = len(pending) - len(pending) % self.decoderunit
+                    if complete:
+                        chunks.append(self.decoder(pending[:complete]))
+                        pending = pending[complete:]
+                if pending:
+                    chunks.append(self.decoder(pending))
+            else:
+                while True:
+                    data = self.substream.read(self.decoderunit)
+                    if data is None or len(data) == 0:
+                        break
+                    chunks.append(self.decoder(data))
+            data = b"".join(chunks)
+            self.rbuffer = b""
+            self.rpos = 0
             self.sincereadwritten += len(data)
             return data
 
         else:
-            if count < 0:
-                raise ValueError("count cannot be negative")
-            while len(self.rbuffer) < count:
-                data = self.substream.read(self.decoderunit)
-                if data is None or len(data) == 0:
-                    return b''
-                self.rbuffer += self.decoder(data)
-            data, self.rbuffer = self.rbuffer[:count], self.rbuffer[count:]
+            available = len(self.rbuffer) - self.rpos
+            if available < count:
+                chunks = [self.rbuffer[self.rpos:]] if available else []
+                while available < count:
+                    units = 1
+                    if self.bulk and self.decodedperunit:
+                        units = -(-(count - available) // self.decodedperunit)
+                    data = self.substream.read(self.decoderunit * units)
+                    if data is None or len(data) == 0:
+                        self.rbuffer = b"".join(chunks)
+                        self.rpos = 0
+                        return b''
+                    decoded = self.decoder(data)
+                    if len(data) == self.decoderunit * units:
+                        self.decodedperunit = len(decoded) // units
+                    chunks.append(decoded)
+                    available += len(decoded)
+                if available == count and len(chunks) == 1:
+                    self.rbuffer = b""
+                    self.rpos = 0
+                    self.sincereadwritten += count
+                    return chunks[0]
+                self.rbuffer = b"".join(chunks)
+                self.rpos = 0
+            data = self.rbuffer[self.rpos:self.rpos+count]
+            self.rpos += count
             self.sincereadwritten += count
             return data
 
     def write(self, data):
-        self.wbuffer += data
         datalen = len(data)
-        while len(self.wbuffer) >= self.encoderunit:
-            data, self.wbuffer = self.wbuffer[:self.encoderunit], self.wbuffer[self.encoderunit:]
-            self.substream.write(self.encoder(data))
+        unit = self.encoderunit
+        if self.bulk and not self.wbuffer and datalen % unit == 0:
+            if datalen:
+                self.substream.write(self.encoder(data))
+        else:
+            self.wbuffer += data
+            complete = len(self.wbuffer) - len(self.wbuffer) % unit
+            if self.bulk and complete:
+                self.substream.write(self.encoder(bytes(self.wbuffer[:complete])))
+            else:
+                for i in range(0, complete, unit):
+                    self.substream.write(self.encoder(bytes(self.wbuffer[i:i+unit])))
+            del self.wbuffer[:complete]
         self.sincereadwritten += datalen
         return datalen
 
     def close(self):
-        if len(self.rbuffer):
-            raise ValueError("closing stream but %d unread bytes remain, %d is decoded unit" % (len(self.rbuffer), self.decoderunit))
+        if len(self.rbuffer) > self.rpos:
+            raise ValueError("closing stream but %d unread bytes remain, %d is decoded unit" % (len(self.rbuffer) - self.rpos, self.decoderunit))
         if len(self.wbuffer):
             raise ValueError("closing stream but %d unwritten bytes remain, %d is encoded unit" % (len(self.wbuffer), self.encoderunit))
 
@@ -71,36 +125,82 @@ class RestreamedBytesIO(object):
 
 
 class RebufferedBytesIO(object):
+    """Buffer is a bytearray, appending to it and cutting off its tail are amortised O(1). Non-blocking substreams with a fileno are waited on using selectors, other substreams are polled with backoff until more data arrives, like a regular file that is still being written. With eoferror enabled, a read that returns no data (EOF) raises IOError instead of polling."""
 
-    def __init__(self, substream, tailcutoff=None):
+    def __init__(self, substream, tailcutoff=None, eoferror=False):
         self.substream = substream
         self.offset = 0
-        self.rwbuffer = b""
+        self.rwbuffer = bytearray()
         self.moved = 0
         self.tailcutoff = tailcutoff
+        self.eoferror = eoferror
+        # one selector per stream, created on first wait, with the fileno it watches
+        self.selector = None
+        self.selectorfileno = None
+
+    def _fileno(self):
+        try:
+            return self.substream.fileno()
+        except Exception:
+            return None
+
+    def _wait(self, fileno):
+        if self.selector is None:
+            self.selector = DefaultSelector()
+        if self.selectorfileno != fileno:
+            if self.selectorfileno is not None:
+                self.selector.unregister(self.selectorfileno)
+                self.selectorfileno = None
+            self.selector.register(fileno, EVENT_READ)
+            self.selectorfileno = fileno
+        self.selector.select()
 
-    def read(self, count=None):
-        if count is None:
-            raise ValueError("count must be integer, reading until EOF not supported")
-        startsat = self.offset
-        endsat = startsat + count
-        if startsat < self.moved:
-            raise IOError("could not read because tail was cut off")
+    def close(self):
+        if self.selector is not None:
+            self.selector.close()
+            self.selector = None
+            self.selectorfileno = None
+
+    def _fill(self, endsat):
+        backoff = 0.0001
         while self.moved + len(self.rwbuffer) < endsat:
             try:
                 newdata = self.substream.read(128*1024)
             except BlockingIOError:
                 newdata = None
-            if not newdata:
-                sleep(0)
+            if newdata:
+                self.rwbuffer += newdata
+                backoff = 0.0001
                 continue
-            self.rwbuffer += newdata
-        data = self.rwbuffer[startsat-self.moved:endsat-self.moved]
-        self.offset += count
+            if newdata is not None and self.eoferror:
+                raise IOError("could not read enough bytes, substream reached EOF")
+            fileno = self._fileno() if newdata is None else None
+            if fileno is not None:
+                try:
+                    self._wait(fileno)
+                    continue
+                except (OSError, ValueError, KeyError):
+                    pass
+            sleep(backoff)
+            backoff = min(backoff * 2, 0.05)
+
+    def _cutoff(self):
         if self.tailcutoff is not None and self.moved < self.offset - self.tailcutoff:
             removed = self.offset - self.tailcutoff - self.moved
             self.moved += removed
-            self.rwbuffer = self.rwbuffer[removed:]
+            del self.rwbuffer[:removed]
+
+    def read(self, count=None):
+        if count is None:
+            raise ValueError("count must be integer, reading until EOF not supported")
+        startsat = self.offset
+        endsat = startsat + count
+        if startsat < self.moved:
+            raise IOError("could not read because tail was cut off")
+        self._fill(endsat)
+        data = bytes(self.rwbuffer[startsat-self.moved:endsat-self.moved])
+        self.offset += count
+        self._cutoff()
         if len(data) < count:
             raise IOError("could not read enough bytes, something went wrong")
         return data
@@ -108,17 +208,12 @@ class RebufferedBytesIO(object):
     def write(self, data):
         startsat = self.offset
         endsat = startsat + len(data)
-        while self.moved + len(self.rwbuffer) < startsat:
-            newdata = self.substream.read(128*1024)
-            self.rwbuffer += newdata
-            if not newdata:
-                sleep(0)
-        self.rwbuffer = self.rwbuffer[:startsat-self.moved] + data + self.rwbuffer[endsat-self.moved:]
+        if startsat < self.moved:
+            raise IOError("could not write because tail was cut off")
+        self._fill(startsat)
+        self.rwbuffer[startsat-self.moved:endsat-self.moved] = data
         self.offset = endsat
-        if self.tailcutoff is not None and self.moved < self.offset - self.tailcutoff:
-            removed = self.offset - self.tailcutoff - self.moved
-            self.moved += removed
-            self.rwbuffer = self.rwbuffer[removed:]
+        self._cutoff()
         return len(data)
 
     def seek(self, at, whence=0):
@@ -1,4 +1,12 @@
 from construct.lib.py3compat import *
+import ast
+import bisect
+import collections.abc
+import fnmatch
+import functools
+import itertools
+import keyword
+import operator
 import re
 import sys
 
@@ -66,6 +74,9 @@ def value_to_string(value):
     if value.__class__.__name__ in ["HexDisplayedBytes", "HexDumpDisplayedBytes"]:
         return str(value)
 
+    if isinstance(value, memoryview):
+        value = value.tobytes()
+
     if isinstance(value, bytes):
         printingcap = 16
         if len(value) <= printingcap or globalPrintFullStrings:
@@ -127,6 +138,8 @@ class Container(dict):
     def __eq__(self, other, /):
         if self is other:
             return True
+        if isinstance(other, Record):
+            other = Container(Record.items(other))
         if not isinstance(other, dict):
             return False
         def isequal(v1, v2):
@@ -175,7 +188,7 @@ class Container(dict):
         items = []
         for key, value in self.__class__.items(self):
             try:
-                if isinstance(value, (Container, ListContainer)):
+                if isinstance(value, (Container, ListContainer, Record)):
                     ret = value.__class__._search(value, compiled_pattern, search_all)
                     if ret is not None:
                         if search_all:
@@ -208,6 +221,18 @@ class Container(dict):
         compiled_pattern = re.compile(pattern)
         return self.__class__._search(self, compiled_pattern, True)
 
+    def query(self, pattern):
+        """
+        Returns the first value matching a path query (see :class:`Query`), or None.
+        """
+        return _query(pattern).find(self)
+
+    def query_all(self, pattern):
+        """
+        Returns all values matching a path query (see :class:`Query`), as a ListContainer.
+        """
+        return _query(pattern).findall(self)
+
     def __getstate__(self, /):
         """
         Used by pickle to serialize an instance to a dict.
@@ -289,70 +314,681 @@ class ListContainer(list):
         compiled_pattern = re.compile(pattern)
         return self._search(compiled_pattern, True)
 
+    query = Container.query
+    query_all = Container.query_all
+
+
+class Record(object):
+    # NOTE: like with Container, fields can shadow methods, so instead of doing `self.items()` you should do `Record.items(self)`.
+    r"""
+    Base class of record classes generated by :func:`recordclass`. Records keep their fields in slots instead of a dictionary, so they take a fraction of the memory of a Container. Fields can be accessed both as attributes and keys, keys are iterated in field order. Fields that were never assigned (because parsing stopped before them) are missing. Equality is the same as that of Container, so records compare equal to Containers and dicts with the same entries.
+
+    Example::
+
+        >>> Point = recordclass(["x", "y"])
+        >>> p = Point(1, 2)
+        >>> p.x, p["y"]
+        (1, 2)
+        >>> p == Container(x=1, y=2)
+        True
+        >>> print(repr(p))
+        Record(x=1, y=2)
+    """
+    __slots__ = ()
+    _fields = ()
+
+    @classmethod
+    def _fromdict(cls, values, /):
+        """Creates a record from a dict that can lack some fields."""
+        record = cls.__new__(cls)
+        for k, v in values.items():
+            setattr(record, k, v)
+        return record
+
+    def __getitem__(self, key, /):
+        if key in self.__class__._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value, /):
+        if key not in self.__class__._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key, /):
+        if key not in self.__class__._fields:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key, /):
+        return key in self.__class__._fields and hasattr(self, key)
+
+    def get(self, key, default=None, /):
+        try:
+            return Record.__getitem__(self, key)
+        except KeyError:
+            return default
+
+    def keys(self, /):
+        return [k for k in self.__class__._fields if hasattr(self, k)]
+
+    def values(self, /):
+        return [v for k, v in Record.items(self)]
+
+    def items(self, /):
+        items = []
+        for k in self.__class__._fields:
+            try:
+                items.append((k, getattr(self, k)))
+            except AttributeError:
+                pass
+        return items
+
+    def __iter__(self, /):
+        return iter(Record.keys(self))
+
+    def __len__(self, /):
+        return len(Record.keys(self))
+
+    def __eq__(self, other, /):
+        return Container.__eq__(Container(Record.items(self)), other)
+
+    def __ne__(self, other, /):
+        return not self == other
+
+    __hash__ = None
+
+    def __copy__(self, /):
+        return self.__class__._fromdict(dict(Record.items(self)))
+
+    def __deepcopy__(self, _, /):
+        return self.__class__.__copy__(self)
+
+    def __repr__(self, /):
+        parts = []
+        for k, v in Record.items(self):
+            if k.startswith("_"):
+                continue
+            parts.append(f'{k}={v!r}')
+        return "%s(%s)" % (self.__class__.__name__, ", ".join(parts))
+
+    def __str__(self, /):
+        indentation = "\n    "
+        text = ["%s: " % (self.__class__.__name__,)]
+        for k, v in Record.items(self):
+            if k.startswith("_") and not globalPrintPrivateEntries:
+                continue
+            text.extend([indentation, k, " = ", indentation.join(value_to_string(v).split("\n"))])
+        return "".join(text)
+
+    _search = Container._search
+    search = Container.search
+    search_all = Container.search_all
+    query = Container.query
+    query_all = Container.query_all
+
+    def __reduce__(self, /):
+        return (_recordunpickle, (self.__class__._fields, dict(Record.items(self))))
+
+
+_recordclasses = {}
+
+
+def recordclass(fields):
+    r"""
+    Returns a :class:`Record` subclass with given fields, in given order. Classes are cached, so asking for the same fields again returns the same class.
+
+    :param fields: iterable of field names, duplicates are ignored
+
+    :raises ValueError: field name is not an identifier, is a keyword, starts with two underscores or is _fields
+    """
+    fields = tuple(dict.fromkeys(fields))
+    cls = _recordclasses.get(fields)
+    if cls is not None:
+        return cls
+    for name in fields:
+        if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name) or name.startswith("__") or name == "_fields":
+            raise ValueError("invalid record field name %r" % (name,))
+    args = "".join(", %s" % name for name in fields)
+    body = "".join("\n    self.%s = %s" % (name, name) for name in fields) or "\n    pass"
+    namespace = {}
+    exec("def __init__(self%s, /):%s" % (args, body), namespace)
+    cls = type("Record", (Record,), dict(__slots__=fields, _fields=fields, __init__=namespace["__init__"], __module__=__name__))
+    _recordclasses[fields] = cls
+    return cls
+
+
+def _recordunpickle(fields, values):
+    return recordclass(fields)._fromdict(values)
+
+
+def _queryitems(node):
+    """Used internally. Items of a dict or record, as their class provides them."""
+    if isinstance(node, Record):
+        return Record.items(node)
+    return node.__class__.items(node)
+
+
+def _querychildren(node):
+    """Used internally. Values of public entries of a dict or record, or items of a list, or nothing."""
+    if isinstance(node, (dict, Record)):
+        return [v for k, v in _queryitems(node) if not (isinstance(k, str) and k.startswith("_"))]
+    if isinstance(node, list):
+        return node
+    return ()
+
+
+def _querydescend(node):
+    """Used internally. Given node and all nodes below it, in document order."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, (dict, Record)):
+            children = [v for k, v in _queryitems(node) if k.__class__ is not str or k[:1] != "_"]
+        elif isinstance(node, list):
+            children = list(node)
+        else:
+            continue
+        children.reverse()
+        stack.extend(children)
+
+
+def _querydescendkey(key):
+    # fused ** and key step, looks up the key in every node while walking
+    def step(node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (dict, Record)):
+                items = _queryitems(node)
+                children = []
+                for k, v in items:
+                    if k == key:
+                        yield v
+                    if k.__class__ is not str or k[:1] != "_":
+                        children.append(v)
+            elif isinstance(node, list):
+                children = list(node)
+            else:
+                continue
+            children.reverse()
+            stack.extend(children)
+    return step
+
+
+def _querykey(key):
+    def step(node):
+        if isinstance(node, (dict, Record)):
+            try:
+                return (node[key],)
+            except KeyError:
+                pass
+        return ()
+    return step
+
+
+def _queryglob(pattern):
+    match = re.compile(fnmatch.translate(pattern)).match
+    def step(node):
+        if isinstance(node, (dict, Record)):
+            return [v for k, v in _queryitems(node) if isinstance(k, str) and not k.startswith("_") and match(k)]
+        return ()
+    return step
+
+
+def _queryindex(index):
+    def step(node):
+        if isinstance(node, list):
+            try:
+                return (node[index],)
+            except IndexError:
+                pass
+        return ()
+    return step
+
+
+def _queryslice(s):
+    def step(node):
+        if isinstance(node, list):
+            return [node[i] for i in range(*s.indices(len(node)))]
+        return ()
+    return step
+
+
+def _queryfilter(fields, op, value):
+    def test(node):
+        try:
+            for k in fields:
+                if not isinstance(node, (dict, Record)):
+                    return False
+                node = node[k]
+            return op(node, value)
+        except (KeyError, TypeError, ValueError):
+            return False
+    def step(node):
+        return [child for child in _querychildren(node) if test(child)]
+    return step
+
+
+_queryoperators = {"==": operator.eq, "!=": operator.ne, "<=": operator.le, ">=": operator.ge, "<": operator.lt, ">": operator.gt}
+_querytokens = re.compile(r"\*\*|[^.\[\]]+")
+_queryslices = re.compile(r"(-?\d*):(-?\d*)(?::(-?\d*))?$")
+_querypredicates = re.compile(r"([\w.]+)\s*(?:(==|!=|<=|>=|<|>)\s*(.+))?$")
+
+
+def _queryparsebracket(pattern, text):
+    if text == "*":
+        return ("children", None, _querychildren)
+    if re.match(r"-?\d+$", text):
+        return ("index", int(text), _queryindex(int(text)))
+    m = _queryslices.match(text)
+    if m:
+        s = slice(*(int(x) if x else None for x in m.groups()))
+        return ("slice", s, _queryslice(s))
+    m = _querypredicates.match(text)
+    if m:
+        path, op, literal = m.groups()
+        fields = path.split(".")
+        if "" in fields:
+            raise ValueError("invalid query %r, empty key in predicate %r" % (pattern, text))
+        if op is None:
+            return ("filter", text, _queryfilter(fields, lambda v, _: bool(v), None))
+        try:
+            value = ast.literal_eval(literal)
+        except (ValueError, SyntaxError):
+            raise ValueError("invalid query %r, predicate value %r is not a literal" % (pattern, literal))
+        return ("filter", text, _queryfilter(fields, _queryoperators[op], value))
+    raise ValueError("invalid query %r, cannot understand [%s]" % (pattern, text))
+
+
+def _queryparse(pattern):
+    steps = []
+    i = 0
+    expectkey = True
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "[":
+            quote = None
+            for end in range(i + 1, len(pattern)):
+                if quote:
+                    if pattern[end] == quote:
+                        quote = None
+                elif pattern[end] in "'\"":
+                    quote = pattern[end]
+                elif pattern[end] == "]":
+                    break
+            else:
+                raise ValueError("invalid query %r, unclosed bracket" % (pattern,))
+            if expectkey and steps:
+                raise ValueError("invalid query %r, bracket after a dot" % (pattern,))
+            steps.append(_queryparsebracket(pattern, pattern[i+1:end].strip()))
+            i = end + 1
+            expectkey = False
+        elif c == ".":
+            if expectkey:
+                raise ValueError("invalid query %r, empty key at %d" % (pattern, i))
+            i += 1
+            expectkey = True
+        else:
+            if not expectkey:
+                raise ValueError("invalid query %r, expected a dot or bracket at %d" % (pattern, i))
+            m = _querytokens.match(pattern, i)
+            if m is None:
+                raise ValueError("invalid query %r, unexpected %r at %d" % (pattern, c, i))
+            key = m.group()
+            if key == "**":
+                steps.append(("descend", None, _querydescend))
+            elif key == "*":
+                steps.append(("children", None, _querychildren))
+            elif "*" in key or "?" in key:
+                steps.append(("glob", key, _queryglob(key)))
+            else:
+                steps.append(("key", key, _querykey(key)))
+            i += len(key)
+            expectkey = False
+    if expectkey:
+        raise ValueError("invalid query %r, expected a key at the end" % (pattern,))
+    fused = []
+    for kind, arg, step in steps:
+        if kind == "key" and fused and fused[-1][0] == "descend":
+            fused[-1] = ("descendkey", arg, _querydescendkey(arg))
+        else:
+            fused.append((kind, arg, step))
+    return fused
+
+
+class Query(object):
+    r"""
+    Compiled path query over parsed trees of dicts (Containers, records) and lists (ListContainers). A query is a path of steps separated by dots, each step takes every node found by previous steps into some nodes below it:
+
+    * ``name`` takes the entry under given key
+    * ``na*e`` ``n?me`` take public entries with keys that match a wildcard pattern
+    * ``*`` or ``[*]`` take all public entries of a dict or all items of a list
+    * ``**`` takes the node itself and all public nodes below it, at any depth
+    * ``[3]`` ``[-1]`` take an item of a list, ``[1:5]`` ``[::2]`` take a slice of a list
+    * ``[name]`` ``[name.inner > 3]`` ``[name == "text"]`` take all public entries or items that have a true value (or a value that compares to given literal) under given keys, comparisons are ``==`` ``!=`` ``<`` ``<=`` ``>`` ``>=``
+
+    Public entries are those with keys that do not start with an underscore. Results come in document order, as a ListContainer. Queries over one tree can be sped up with a :class:`QueryIndex`.
+
+    :param pattern: string
+
+    :raises ValueError: pattern is not a valid query
+
+    Example::
+
+        >>> q = Query("sections[type == 2].entries[*].name")
+        >>> q.findall(obj)
+        ListContainer(['a', 'b'])
+        >>> q.find(obj)
+        'a'
+        >>> Query("**.name").findall(obj)
+        ListContainer(['text', 'a', 'b'])
+    """
+    __slots__ = ('pattern', 'steps')
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.steps = _queryparse(pattern)
+
+    def __repr__(self):
+        return "Query(%r)" % (self.pattern,)
+
+    def _iterate(self, obj):
+        nodes = (obj,)
+        for kind, arg, step in self.steps:
+            nodes = itertools.chain.from_iterable(map(step, nodes))
+        return nodes
+
+    def findall(self, obj):
+        """Returns all values that match the query, as a ListContainer."""
+        return ListContainer(self._iterate(obj))
+
+    def find(self, obj, default=None):
+        """Returns the first value that matches the query, or default. Stops looking at the first match."""
+        return next(iter(self._iterate(obj)), default)
+
+
+@functools.lru_cache(maxsize=256)
+def _querycached(pattern):
+    return Query(pattern)
+
+
+def _query(query):
+    """Used internally. Returns given Query, or a cached Query for given pattern."""
+    if isinstance(query, Query):
+        return query
+    return _querycached(query)
+
+
+class QueryIndex(object):
+    r"""
+    Index of a parsed tree, for answering many queries over it. Building walks the tree once. Queries that descend with ``**`` into a key (like ``**.name`` or ``items[*].**.name``) find the matches by bisection instead of walking the subtree, and other descents take a slice of the nodes in document order, so repeated lookups take time close to the amount of results. Results are the same as of :class:`Query`.
+
+    The index describes the tree at the time it was built, and keeps it alive. Modified trees need a new index.
+
+    :param obj: root of the tree, usually a Container
+
+    Example::
+
+        >>> index = QueryIndex(obj)
+        >>> index.findall("**.name")
+        ListContainer(['text', 'a', 'b'])
+        >>> index.find(Query("sections[0].type"))
+        1
+    """
+    __slots__ = ('root', 'order', 'spans', 'bykey')
+
+    def __init__(self, obj):
+        self.root = obj
+        # public nodes in document order, and (start, stop) range of the subtree of every dict or list in it
+        self.order = []
+        self.spans = {}
+        # key -> positions of the parent dicts in document order, and values, both in document order of the parents
+        self.bykey = {}
+        order = self.order
+        spans = self.spans
+        bykey = self.bykey
+        def children(node, start):
+            if isinstance(node, list):
+                return iter(node)
+            children = []
+            for k, v in _queryitems(node):
+                if k.__class__ is str and k[:1] == "_":
+                    continue
+                entry = bykey.get(k)
+                if entry is None:
+                    entry = bykey[k] = ([], [])
+                entry[0].append(start)
+                entry[1].append(v)
+                children.append(v)
+            return iter(children)
+        # iterative like _querydescend, so deep trees do not hit the recursion limit
+        order.append(obj)
+        stack = [(obj, 0, children(obj, 0))] if isinstance(obj, (dict, Record, list)) else []
+        while stack:
+            node, start, iterator = stack[-1]
+            for child in iterator:
+                order.append(child)
+                if isinstance(child, (dict, Record, list)):
+                    stack.append((child, len(order) - 1, children(child, len(order) - 1)))
+                    break
+            else:
+                stack.pop()
+                spans[id(node)] = (start, len(order))
+
+    def _descend(self, node):
+        span = self.spans.get(id(node))
+        if span is None:
+            return _querydescend(node)
+        return self.order[span[0]:span[1]]
+
+    def _descendkey(self, key):
+        fallback = _querydescendkey(key)
+        positions, values = self.bykey.get(key, ((), ()))
+        def step(node):
+            span = self.spans.get(id(node))
+            if span is None:
+                return fallback(node)
+            return values[bisect.bisect_left(positions, span[0]):bisect.bisect_left(positions, span[1])]
+        return step
+
+    def _iterate(self, query):
+        nodes = (self.root,)
+        for kind, arg, step in _query(query).steps:
+            if kind == "descend":
+                step = self._descend
+            elif kind == "descendkey" and not (isinstance(arg, str) and arg.startswith("_")):
+                step = self._descendkey(arg)
+            nodes = itertools.chain.from_iterable(map(step, nodes))
+        return nodes
+
+    def findall(self, query):
+        """Returns all values that match given Query or pattern, as a ListContainer."""
+        return ListContainer(self._iterate(query))
+
+    def find(self, query, default=None):
+        """Returns the first value that matches given Query or pattern, or default."""
+        return next(iter(self._iterate(query)), default)
+
+
+#: Bookkeeping entries of every Context, kept in slots instead of the dictionary.
+contextslotnames = ('_', '_root', '_params', '_parsing', '_building', '_sizing', '_io', '_index', '_subcons')
+contextslots = frozenset(contextslotnames)
+
 
 class Context(Container):
-    """Special type of Container used to store contextual information during processing."""
+    """
+    Special type of Container used to store contextual information during processing.
+
+    Bookkeeping entries (``_`` ``_root`` ``_params`` ``_parsing`` ``_building`` ``_sizing`` ``_io`` ``_index`` ``_subcons``) are kept in slots, and the dictionary holds only named fields, so creating a context does not fill a dictionary. They still behave like keys, for lookups like ``context["_io"]`` and ``context.get("_index")`` as well as for iteration and the ``keys`` ``values`` ``items`` views, but they cannot be deleted.
+
+    Nested dictionaries are wrapped as child contexts when set. Entries of a wrapped dictionary are copied into the child only when first accessed, or all at once before operations that see the whole dictionary (like iteration and equality), so building nested objects does not copy the whole subtree at every nesting level.
+    """
+    __slots__ = contextslotnames + ('_pending',)
 
     def __init__(self, _parsing=False, _building=False, _sizing=False, _io=None, _index=0, _subcons=None, **kwargs):
-        super().__init__(
-            _=None,                   # Parent context.
-            _root=None,               # Root context.
-            _params=self,             # Global parameters.
-            # TODO: Perhaps have a "state" attribute instead to avoid contradictions due to multiple flags being true.
-            _parsing=_parsing,        # Processing parsing()?
-            _building=_building,      # Processing building()?
-            _sizing=_sizing,          # Processing sizeof()?
-            _io=_io,                  # Processing stream.
-            _index=_index,            # Current index (for Array)
-            _subcons=_subcons or [],  # Current subcons
-        )
+        super().__init__()
+        self._pending = None
+        self._ = None                   # Parent context.
+        self._root = None               # Root context.
+        self._params = self             # Global parameters.
+        # TODO: Perhaps have a "state" attribute instead to avoid contradictions due to multiple flags being true.
+        self._parsing = _parsing        # Processing parsing()?
+        self._building = _building      # Processing building()?
+        self._sizing = _sizing          # Processing sizeof()?
+        self._io = _io                  # Processing stream.
+        self._index = _index            # Current index (for Array)
+        self._subcons = _subcons or []  # Current subcons
         # Recursively build internal dictionaries as child contexts.
         for key, value in kwargs.items():
-            self[key] = self._value_set(value)
+            self[key] = value
 
     def __setitem__(self, key, value):
-        super().__setitem__(key, self._value_set(value))
+        if key in contextslots:
+            object.__setattr__(self, key, value)
+        else:
+            dict.__setitem__(self, key, self._value_set(value))
 
     def update(self, m, /, **kwargs):
-        super().update({
-            key: self._value_set(value)
-            for key, value in dict(m, **kwargs).items()}
-        )
+        if isinstance(m, Record):
+            m = Record.items(m)
+        values = {}
+        for key, value in dict(m, **kwargs).items():
+            if key in contextslots:
+                object.__setattr__(self, key, value)
+            else:
+                values[key] = self._value_set(value)
+        dict.update(self, values)
 
     def _value_set(self, value):
         """Hook for when a value is set."""
-        # Recursively build internal dictionaries as child contexts.
+        # Internal dictionaries become child contexts, that copy their entries when accessed.
         if isinstance(value, dict) and value is not self and not isinstance(value, Context):
-            value = self.create_child(**value)
+            child = self.create_child(_io=value.get("_io"), _subcons=value.get("_subcons"))
+            child._pending = value
+            value = child
+        return value
+
+    def __missing__(self, key):
+        if key in contextslots:
+            return object.__getattribute__(self, key)
+        pending = self._pending
+        if pending is None or key not in pending:
+            raise KeyError(key)
+        value = self._value_set(pending[key])
+        dict.__setitem__(self, key, value)
         return value
 
+    def __getattr__(self, name):
+        if name in contextslots or name == "_pending":
+            # instances made without __init__, like when unpickling
+            return None
+        try:
+            return Context.__missing__(self, name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def _resolve(self):
+        """Copies all pending entries."""
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            for key, value in pending.items():
+                if key not in contextslots and not dict.__contains__(self, key):
+                    dict.__setitem__(self, key, self._value_set(value))
+
+    def __contains__(self, key, /):
+        if key in contextslots:
+            return True
+        if self._pending is not None:
+            Context._resolve(self)
+        return dict.__contains__(self, key)
+
+    def __delitem__(self, key, /):
+        if key in contextslots:
+            raise TypeError("bookkeeping entry %r cannot be deleted" % (key,))
+        if self._pending is not None:
+            Context._resolve(self)
+        dict.__delitem__(self, key)
+
+    def __iter__(self, /):
+        if self._pending is not None:
+            Context._resolve(self)
+        return itertools.chain(contextslotnames, dict.__iter__(self))
+
+    def __len__(self, /):
+        if self._pending is not None:
+            Context._resolve(self)
+        return len(contextslotnames) + dict.__len__(self)
+
+    def keys(self, /):
+        return collections.abc.KeysView(self)
+
+    def values(self, /):
+        return collections.abc.ValuesView(self)
+
+    def items(self, /):
+        return collections.abc.ItemsView(self)
+
+    def get(self, key, default=None, /):
+        if key in contextslots:
+            return object.__getattribute__(self, key)
+        if self._pending is not None:
+            Context._resolve(self)
+        return dict.get(self, key, default)
+
+    def pop(self, key, /, *args):
+        if key in contextslots:
+            raise TypeError("bookkeeping entry %r cannot be deleted" % (key,))
+        if self._pending is not None:
+            Context._resolve(self)
+        return dict.pop(self, key, *args)
+
+    def popitem(self, /):
+        if self._pending is not None:
+            Context._resolve(self)
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None, /):
+        if self._pending is not None:
+            Context._resolve(self)
+        return dict.setdefault(self, key, default)
+
+    def __getstate__(self, /):
+        return dict(Context.items(self))
+
     def create_child(self, _io=None, _subcons=None, **kwargs):
         """Factory method for initializing a child Context."""
-        # Don't allow children to change the processing status or index
-        kwargs.pop('_parsing', None)
-        kwargs.pop('_building', None)
-        kwargs.pop('_sizing', None)
-        kwargs.pop('_index', None)
-
-        context = Context(
-            _parsing=self._parsing,
-            _building=self._building,
-            _sizing=self._sizing,
-            _io=_io,
-            _subcons=_subcons,
-            _index=self._index,
-            **kwargs,
-        )
+        context = Context.__new__(Context)
+        context.__dict__ = context
+        context._pending = None
         context._ = self
-        context._params = self._params
         # First child is root, since the very first parent context holds the user defined external parameters.
-        context._root = self._root or context
+        context._root = self._root if self._root is not None else context
+        context._params = self._params
+        # Don't allow children to change the processing status or index
+        context._parsing = self._parsing
+        context._building = self._building
+        context._sizing = self._sizing
+        context._io = _io
+        context._index = self._index
+        context._subcons = _subcons or []
+        for key, value in kwargs.items():
+            if key not in contextslots:
+                context[key] = value
         return context
 
     def get_child(self, name, default=None):
         """Retrieves child Context or returns default if it doesn't exist."""
         child_context = self.get(name, None)
-        if child_context and isinstance(child_context, Context):
+        if isinstance(child_context, Context):
             return child_context
         else:
             return default
@@ -43,6 +43,12 @@ def common(format, data_sample, obj_sample, size_sample=SizeofError, **kw):
         assert obj == obj_sample
         data = cformat.build(obj_sample, **kw)
         assert data == data_sample
+        if isinstance(size_sample, int):
+            size = cformat.sizeof(**kw)
+            assert size == size_sample
+        else:
+            with pytest.raises(size_sample):
+                cformat.sizeof(**kw)
 
 def commonhex(format, hexdata):
     commonbytes(format, binascii.unhexlify(hexdata))
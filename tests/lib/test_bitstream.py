@@ -3,8 +3,50 @@ from construct.lib.bitstream import *
 
 
 def test_restreamed():
-    # tested by Bitwise Bytewise ByteSwapped BitsSwapped cases
-    pass
+    # also tested by Bitwise Bytewise ByteSwapped BitsSwapped cases
+    calls = []
+    def decoder(data):
+        calls.append(len(data))
+        return bytes2bits(data)
+
+    bstream = RestreamedBytesIO(io.BytesIO(b"\xf0" * 100), decoder, 1, bits2bytes, 8, bulk=True)
+    assert bstream.read(4) == b"\x01" * 4
+    assert bstream.read(4 + 8*50) == b"\x00" * 4 + b"\x01\x01\x01\x01\x00\x00\x00\x00" * 50
+    assert calls == [1, 50]
+    assert bstream.read(8*100) == b""
+    assert bstream.read() == b"\x01\x01\x01\x01\x00\x00\x00\x00" * 49
+    assert bstream.tell() == 8*100
+    bstream.close()
+
+    # reading until EOF decodes bounded chunks of whole units
+    class ShortReads(io.RawIOBase):
+        def __init__(self, data):
+            self.data = io.BytesIO(data)
+        def read(self, count=-1):
+            return self.data.read(1001 if count < 0 else min(count, 1001))
+    def identity(data):
+        calls.append(len(data))
+        return data
+    data = bytes(range(256)) * 800 + b"x"
+    for substream in [io.BytesIO(data), ShortReads(data)]:
+        calls = []
+        bstream = RestreamedBytesIO(substream, identity, 3, identity, 3, bulk=True)
+        assert bstream.read(-1) == data
+        assert max(calls) <= 64*1024
+        assert all(n % 3 == 0 for n in calls[:-1])
+        assert bstream.read(None) == b""
+
+    calls = []
+    bstream = RestreamedBytesIO(io.BytesIO(b"\xf0" * 100), decoder, 1, bits2bytes, 8)
+    assert bstream.read(8*10) == b"\x01\x01\x01\x01\x00\x00\x00\x00" * 10
+    assert calls == [1] * 10
+
+    output = io.BytesIO()
+    bstream = RestreamedBytesIO(output, bytes2bits, 1, bits2bytes, 8, bulk=True)
+    assert bstream.write(b"\x01\x01") == 2
+    assert bstream.write(b"\x01\x01\x00\x00\x00\x00" + b"\x00" * 16) == 22
+    assert output.getvalue() == b"\xf0\x00\x00"
+    bstream.close()
 
 
 def test_rebuffered():
@@ -54,3 +96,62 @@ def test_rebuffered():
         assert bstream.read(50) == data[at:at + 50]
         jumpback = random.randrange(1, 19)
         assert bstream.seek(-jumpback, 1)
+
+    print("cutting off trail keeps buffer bounded")
+    bstream = RebufferedBytesIO(io.BytesIO(bytes(10**6)), tailcutoff=100)
+    for i in range(1000):
+        assert bstream.read(1000) == bytes(1000)
+        assert bstream.cachedto() - bstream.cachedfrom() <= 128*1024 + 100
+    with pytest.raises(IOError):
+        bstream.seek(0)
+        bstream.read(1)
+
+
+@skipif(os.name != "posix", reason="needs non-blocking pipes")
+def test_rebuffered_pipe():
+    import threading, time
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    with open(r, "rb", buffering=0) as reader:
+        def writer():
+            time.sleep(0.1)
+            os.write(w, b"abc")
+            time.sleep(0.1)
+            os.write(w, b"def")
+            os.close(w)
+        thread = threading.Thread(target=writer)
+        thread.start()
+        bstream = RebufferedBytesIO(reader, eoferror=True)
+        start = time.process_time()
+        assert bstream.read(5) == b"abcde"
+        # waiting blocks on the pipe instead of spinning
+        assert time.process_time() - start < 0.1
+        assert bstream.seek(1) == 1
+        assert bstream.read(5) == b"bcdef"
+        with pytest.raises(IOError):
+            bstream.read(1)
+        thread.join()
+        # waits reuse one selector
+        assert bstream.selector is not None and bstream.selectorfileno == reader.fileno()
+        bstream.close()
+        assert bstream.selector is None
+
+def test_rebuffered_growing_file(tmp_path):
+    import threading, time
+    filename = str(tmp_path / "example_growing")
+    with open(filename, "wb") as f:
+        f.write(b"abc")
+    with open(filename, "rb", buffering=0) as reader:
+        def writer():
+            time.sleep(0.1)
+            with open(filename, "ab") as f:
+                f.write(b"def")
+        thread = threading.Thread(target=writer)
+        thread.start()
+        # EOF of a regular file is polled, the file can still grow
+        bstream = RebufferedBytesIO(reader)
+        assert bstream.read(5) == b"abcde"
+        thread.join()
+        bstream = RebufferedBytesIO(reader, eoferror=True)
+        with pytest.raises(IOError):
+            bstream.read(1)
@@ -363,3 +363,90 @@ def test_method_shadowing_2():
     assert Container.search(c, 'y') == None
     pytest.raises(ZeroDivisionError, c.search, 'x')
 
+
+def test_context_lazy_children():
+    obj = dict(a=dict(b=dict(c=1)), items=[1])
+    c = Context(obj=obj)
+    assert type(c.obj) is Context
+    assert c.obj._ is c
+    assert dict.__len__(c.obj) == dict.__len__(Context())
+    assert c.obj.a.b.c == 1
+    assert c["obj"]["a"]._ is c.obj
+    assert c.obj == obj
+    assert "items" in c.obj
+    assert c.obj["items"] == [1]
+    c.obj.a.b.c = 2
+    assert obj["a"]["b"]["c"] == 1
+    with pytest.raises(AttributeError):
+        c.obj.unknownkey
+    with pytest.raises(KeyError):
+        c.obj["unknownkey"]
+
+
+def test_context_slots():
+    root = Context(_params={"p": 1}, _parsing=True, x=1)
+    assert dict.__len__(root) == 1
+    assert root._params == {"p": 1}
+    assert root["_parsing"] is True
+    assert root._io is None
+    child = root.create_child(_io="io", y=2)
+    assert dict.__len__(child) == 1
+    assert child._ is root
+    assert child._root is child
+    assert child.create_child()._root is child
+    assert child._params is root._params
+    assert child._parsing is True
+    assert child._io == "io"
+    assert child._.x == 1
+    assert "_index" in child
+    child["_index"] = 3
+    assert child.get("_index") == 3
+    assert dict(child)["y"] == 2
+    keys = child.keys()
+    assert keys & {"_io", "y", "z"} == {"_io", "y"}
+    child.z = 3
+    assert "z" in keys and ("z", 3) in child.items() and 3 in child.values()
+    assert len(keys) == len(child) == len(list(keys))
+    assert list(child.items())[:2] == [("_", root), ("_root", child)]
+    with pytest.raises(TypeError):
+        del child["_io"]
+    with pytest.raises(TypeError):
+        child.pop("_io", None)
+    assert "_io" in child and child._io == "io"
+    del child["z"]
+    assert "z" not in keys
+
+
+def test_record():
+    Point = recordclass(["x", "y", "x"])
+    assert Point._fields == ("x", "y")
+    assert recordclass(("x", "y")) is Point
+    p = Point(1, 2)
+    assert p.x == p["x"] == 1
+    assert list(p) == ["x", "y"]
+    assert len(p) == 2
+    assert p == Container(x=1, y=2) == p
+    assert Container(x=1, y=2) == p
+    assert dict(x=1, y=2) == p
+    assert p != Container(x=1, y=3)
+    assert p != Point(1, 3)
+    assert repr(p) == "Record(x=1, y=2)"
+    assert str(p) == "Record: \n    x = 1\n    y = 2"
+    p["y"] = 3
+    assert p.y == 3
+    with pytest.raises(KeyError):
+        p["z"] = 1
+    with pytest.raises(AttributeError):
+        p.z = 1
+    del p["y"]
+    assert "y" not in p
+    assert p.get("y") is None
+    with pytest.raises(KeyError):
+        p["y"]
+    q = Point._fromdict(dict(y=5))
+    assert dict(q.items()) == dict(y=5)
+    import copy, pickle
+    assert copy.copy(q) == q
+    assert pickle.loads(pickle.dumps(Point(1, 2))) == Point(1, 2)
+    with pytest.raises(ValueError):
+        recordclass(["not valid"])
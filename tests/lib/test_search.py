@@ -82,3 +82,52 @@ def test_search_all_regexp():
     obj1 = d.parse(b"\x11\x21\x22\x02\x02\x13\x51\x52")
 
     assert obj1.search_all("ab.*") == [0x21, 0x22, 0x02, 0x02]
+
+
+def test_query():
+    obj1 = d.parse(b"\x11\x21\x22\x02\x02\x13\x51\x52")
+    index = QueryIndex(obj1)
+
+    for pattern, expected in [
+        ("aa", [0x11]),
+        ("ab.abc.abcb.abcb2a", [0x02]),
+        ("ab.*", [0x21, 0x22, obj1.ab.abc]),
+        ("ab.ab?", [0x21, 0x22, obj1.ab.abc]),
+        ("**.abca", [0x02]),
+        ("**.ada", [0x51, 0x52]),
+        ("ad[*].ada", [0x51, 0x52]),
+        ("ad[-1].ada", [0x52]),
+        ("ad[5].ada", []),
+        ("ad[1:].ada", [0x52]),
+        ("ad[::-1].ada", [0x52, 0x51]),
+        ("ad[ada > 0x51].ada", [0x52]),
+        ("ad[ada != 0x51]", [Container(ada=0x52)]),
+        ("ab[abcb.abcb2a == 2].abca", [0x02]),
+        ("ab[abca]", [obj1.ab.abc]),
+        ("ab.**.abcb2a", [0x02]),
+        ("missing", []),
+    ]:
+        assert Query(pattern).findall(obj1) == expected
+        assert index.findall(pattern) == expected
+
+    assert len(Query("**").findall(obj1)) == len(index.findall("**")) == 15
+    assert Query("**._io").findall(obj1) == index.findall("**._io") != []
+    assert obj1.query("**.ada") == index.find("**.ada") == 0x51
+    assert obj1.query("missing") is None
+    assert obj1.query_all(Query("**.ada")) == obj1.ad.query_all("[*].ada") == [0x51, 0x52]
+    assert Container(x=ListContainer([Container(y=1), Container(y=2)])).query_all("**.y") == [1, 2]
+
+    # deep trees are indexed without recursion
+    deep = Container(a=0)
+    for i in range(1, 5000):
+        deep = Container(a=i, b=ListContainer([deep]))
+    index = QueryIndex(deep)
+    assert index.findall("**.a") == Query("**.a").findall(deep) == list(range(4999, -1, -1))
+    assert index.findall("b[0].**.a")[-1] == 0
+    assert index.find("**.b[0].b") is not None and index.findall("**")[-1] == 0
+
+
+def test_query_invalid():
+    for pattern in ["", "a..b", ".a", "a.", "a[", "a[]", "a.[0]", "a[x ==]", "a[x == y]", "]a", "a]"]:
+        with pytest.raises(ValueError):
+            Query(pattern)
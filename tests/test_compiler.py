@@ -193,3 +193,356 @@ def test_compiled_example_integrity():
     data2 = d.build(obj)
     assert obj == obj2
     assert data == data2
+
+def test_compiled_cachedir(tmp_path, monkeypatch):
+    import construct.core
+    def make(n, field=Int8ub):
+        return Struct(
+            "a" / field,
+            "b" / ExprAdapter(Int8ub, lambda obj,ctx: obj + n[0], lambda obj,ctx: obj - n[0]),
+            "c" / Rebuild(Int8ub, len_(this.d)),
+            "d" / Bytes(this.c),
+        )
+    c1 = make([1]).compile(cachedir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    clearCompileCache()
+
+    # structurally identical tree skips code generation, and links its own instances
+    monkeypatch.setattr(construct.core, "CodeGen", None)
+    n = [1]
+    d2 = make(n)
+    c2 = d2.compile(cachedir=str(tmp_path))
+    n[0] = 5
+    assert c2.source == c1.source
+    assert c2.parse(b"\x01\x01\x02ab") == Container(a=1, b=6, c=2, d=b"ab")
+    assert c2.build(dict(a=1, b=6, d=b"ab")) == b"\x01\x01\x02ab"
+    monkeypatch.undo()
+
+    make([1], Int16ub).compile(cachedir=str(tmp_path))
+    make([2]).compile(cachedir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 3
+
+def test_compiled_memoisation(monkeypatch):
+    import construct.core
+    def make(extra):
+        inner = Struct("x" / Int16ub, "y" / Array(2, Struct("k" / Byte, "v" / Int8ub)))
+        return Struct("a" / inner, "b" / inner, extra / Int8ub)
+    data = b"\x00\x01\x02\x03\x04\x05" * 2 + b"\x07"
+
+    c1 = make("c").compile()
+    c2 = make("d").compile()
+    assert "sharedparsers[" in c2.source and "sharedbuilders[" in c2.source
+    assert c2.parse(data) == make("d").parse(data)
+    assert c2.build(c2.parse(data)) == data
+
+    # equal trees skip code generation
+    monkeypatch.setattr(construct.core, "CodeGen", None)
+    c3 = make("c").compile()
+    assert c3.source == c1.source
+    assert c3.parse(data) == c1.parse(data)
+    monkeypatch.undo()
+
+    # same named classes are not confused
+    def adapter(n):
+        class Plus(Adapter):
+            def _decode(self, obj, ctx, path):
+                return obj + n
+        return Plus(Byte)
+    assert Struct("a" / adapter(1)).compile().parse(b"\x00") == Container(a=1)
+    assert Struct("a" / adapter(2)).compile().parse(b"\x00") == Container(a=2)
+
+def test_compiled_cache_bounded():
+    import construct.core, gc, weakref
+    try:
+        setGlobalCompileCache(2)
+        for n in range(5):
+            Struct("a" / Int8ub, "b" / Array(2, Struct("x" / Int8ub)), "c%d" % n / Int8ub).compile()
+        assert len(construct.core.compiledcache) == 2
+        assert len(construct.core.sharedparsercache) <= 16
+
+        # entries and digests do not keep constructs and their functions alive
+        clearCompileCache()
+        d = Struct("a" / ExprAdapter(Int8ub, lambda obj,ctx: obj + 1, lambda obj,ctx: obj - 1))
+        ref = weakref.ref(d)
+        d.compile()
+        setGlobalCompileCache(0)
+        del d
+        gc.collect()
+        assert ref() is None
+        assert len(construct.core.compiledcache) == len(construct.core.sharedparsercache) == 0
+    finally:
+        setGlobalCompileCache()
+
+def test_compiled_strings():
+    d = Struct(
+        "a" / PaddedString(8, "utf16"),
+        "b" / PascalString(Byte, "utf8"),
+        "c" / CString("utf32"),
+        "d" / Prefixed(Byte, GreedyString("ascii")),
+        "e" / NullTerminated(GreedyBytes, term=b"\xff\xff", include=True),
+    )
+    c = d.compile()
+    assert "linkedparsers[" not in c.source and "linkedbuilders[" not in c.source
+    obj = Container(a=u"Аф", b=u"Афон", c=u"x", d=u"abc", e=b"\x01\x02\xff\xff")
+    data = d.build(obj)
+    assert c.build(obj) == data
+    assert c.parse(data) == d.parse(data) == obj
+
+    # errors match the interpreter
+    for e, data in [
+        (StringError, b"\x00\xd8" * 4),
+        (StreamError, bytes(8) + b"\x04ab"),
+        (StreamError, bytes(9) + b"x\x00\x00\x00"),
+    ]:
+        with pytest.raises(e):
+            d.parse(data)
+        with pytest.raises(e):
+            c.parse(data)
+    with pytest.raises(PaddingError):
+        c.build(dict(obj, a=u"abcde"))
+    with pytest.raises(StringError):
+        c.build(dict(obj, b=b"bytes"))
+    with pytest.raises(StringError):
+        c.build(dict(obj, d=u"Афон"))
+
+def test_compiled_fixedruns():
+    d = Struct(
+        "magic" / Const(b"MZ"),
+        "a" / Int16ub,
+        Padding(2),
+        "b" / BytesInteger(3, swapped=True),
+        "c" / Bytes(2),
+        "d" / Int32ul,
+        "e" / Float32l,
+        "n" / Int8ul,
+        "f" / Bytes(this.n),
+    )
+    data = b"MZ\x00\x01\x00\x00\x01\x02\x03ab\x04\x00\x00\x00\x00\x00\x80\x3f\x02xy"
+    c = d.compile()
+    assert c.source.count(".unpack(io.read(") == 2
+    assert c.parse(data) == d.parse(data) == Container(magic=b"MZ", a=1, b=0x030201, c=b"ab", d=4, e=1.0, n=2, f=b"xy")
+    with pytest.raises(ConstError) as e:
+        c.parse(b"ZM" + data[2:])
+    assert "parsing expected b'MZ' but parsed b'ZM'" in str(e.value)
+    c = Struct("a" / Const(b"MZ"), "b" / Const(1, Int8ub), "c" / Const(2, Int16ub)).compile()
+    assert c.source.count("def parse_const(") == 1
+    with pytest.raises(ConstError) as e:
+        c.parse(b"MZ\x01\x00\x03")
+    assert "parsing expected 2 but parsed 3" in str(e.value)
+
+    d = Sequence(Int8ub, "x" / Int16ub, Padding(1), Int8sb, Bytes(this.x))
+    c = d.compile()
+    assert c.parse(b"\x01\x00\x02\x00\xffab") == d.parse(b"\x01\x00\x02\x00\xffab") == [1, 2, None, -1, b"ab"]
+
+def test_compiled_bitwise():
+    d = BitStruct(
+        "a" / Flag,
+        "b" / Nibble,
+        "c" / BitsInteger(10, signed=True),
+        Padding(1),
+        "d" / Octet,
+    )
+    c = d.compile()
+    assert "bytes2bits" not in c.source
+    for data in [b"\xbe\xef\x01", b"\x00\x00\x00", b"\xff\xff\xff"]:
+        obj = d.parse(data)
+        assert c.parse(data) == obj
+        assert c.build(obj) == d.build(obj)
+    with pytest.raises(IntegerError):
+        c.build(dict(a=True, b=16, c=0, d=0))
+    with pytest.raises(IntegerError):
+        c.build(dict(a=True, b=0, c=-513, d=0))
+    with pytest.raises(StreamError):
+        c.parse(b"\xbe")
+
+    # other layouts compile through bytes2bits
+    d = Struct("x" / BitStruct("a" / Nibble, "b" / Bytewise(Int8ub), "c" / Nibble), "y" / BitsSwapped(BitStruct("a" / Nibble, "b" / Nibble)))
+    c = d.compile()
+    assert "linkedparsers[" not in c.source and "linkedbuilders[" not in c.source
+    data = b"\x12\x34\x56"
+    assert c.parse(data) == d.parse(data)
+    assert c.build(d.parse(data)) == data
+
+def test_compiled_array_bulk():
+    d = Struct(
+        "n" / Int8ub,
+        "a" / Array(this.n, Int32ul),
+        "b" / PrefixedArray(Int16ub, "x" / Float32b),
+        "c" / Array(2, Int8sb, discard=True),
+    )
+    c = d.compile()
+    assert "for i in range" not in c.source
+    obj = Container(n=3, a=[1, 2, 2**32-1], b=[0.5, -1.0], c=[])
+    data = d.build(dict(obj, c=[-1, 1]))
+    assert c.build(dict(obj, c=[-1, 1])) == data
+    assert c.parse(data) == d.parse(data) == obj
+    with pytest.raises(RangeError):
+        c.build(dict(obj, n=2, c=[-1, 1]))
+    with pytest.raises(FormatFieldError):
+        c.build(dict(obj, a=[1, 2, -1], c=[-1, 1]))
+    with pytest.raises(StreamError):
+        c.parse(data[:5])
+
+def test_compiled_sizeof():
+    d = Struct(
+        "a" / Int32ub,
+        "b" / Array(4, Int16ul),
+        "c" / BitStruct("x" / Nibble, "y" / Nibble),
+        "n" / Int8ub,
+        "d" / Bytes(this.n),
+        "e" / Struct("m" / Int8ub, "f" / Bytes(this.m)),
+        "g" / IfThenElse(this.n > 2, Int8ub, Int16ub),
+    )
+    c = d.compile()
+    assert "sizeofall(this):\n    try:\n        return 14 + " in c.source
+    for n, m in [(2, 0), (5, 3)]:
+        assert c.sizeof(n=n, e=dict(m=m)) == d.sizeof(n=n, e=dict(m=m))
+    with pytest.raises(SizeofError):
+        c.sizeof()
+    assert Struct("a" / Int8ub, "b" / Padding(3)).compile().source.count("return 4\n") == 1
+    with pytest.raises(SizeofError):
+        Struct("a" / CString("utf8")).compile().sizeof()
+    for d, e in [
+        (Array(this.n, Int16ub), SizeofError),
+        (LazyArray(this.n, Int16ub), SizeofError),
+        (Padded(this.n, Byte), PaddingError),
+        (FixedSized(this.n, Byte), PaddingError),
+    ]:
+        c = d.compile()
+        assert c.sizeof(n=3) == d.sizeof(n=3)
+        with pytest.raises(e):
+            d.sizeof(n=-1)
+        with pytest.raises(e):
+            c.sizeof(n=-1)
+    with pytest.raises(SizeofError):
+        Array(-1, Int16ub).compile().sizeof()
+
+def test_compiled_hybrid():
+    d = Struct(
+        "a" / Int8ub,
+        "b" / Bytes(lambda this: this.a),
+        "u" / Union(lambda this: 0, "x" / Int8ub),
+    )
+    with pytest.raises(SyntaxError):
+        d.compile()
+    c = d.compile(hybrid=True)
+    assert c.parse(b"\x02abc") == d.parse(b"\x02abc")
+    assert c.build(dict(a=2, b=b"ab", u=dict(x=99))) == b"\x02abc"
+    assert [(r.path, r.kind, r.construct) for r in c.report] == [
+        ("(compiling) -> b", "parse", "Bytes"),
+        ("(compiling) -> u", "parse", "Union"),
+        ("(compiling) -> b", "sizeof", "Bytes"),
+        ("(compiling) -> u", "sizeof", "Union"),
+    ]
+    assert c.report[0].reason.startswith("SyntaxError")
+    assert c.report[1].reason.startswith("NotImplementedError")
+    assert d.compile(hybrid=True).report == c.report
+    assert Struct("u" / Union(0, "x" / Int8ub)).compile().report[0].path == "(compiling) -> u"
+    assert Struct("a" / Int8ub).compile().report == []
+
+    class Faulty(Construct):
+        def _parse(self, stream, context, path):
+            return stream_read(stream, 1, path)
+        def _emitparse(self, code):
+            code.append("""
+                def parse_faulty(io, this):
+                    return undefined_helper(io)
+            """)
+            return "parse_faulty(io, this)"
+        def _emitbuild(self, code):
+            return "undefined_builder(obj, io)"
+    d = Struct("a" / Faulty(), "b" / LazyBound(lambda: Byte))
+    c = d.compile(hybrid=True)
+    assert "undefined_helper" not in c.source and "undefined_builder" not in c.source
+    assert [(r.path, r.kind) for r in c.report][:2] == [("(compiling) -> a", "parse"), ("(compiling) -> a", "build")]
+    assert c.report[0].reason.startswith("SyntaxError") and c.report[1].reason.startswith("NameError")
+    assert c.parse(b"xy") == d.parse(b"xy")
+
+def test_compiled_context_elision():
+    d = Struct(
+        "n" / Int8ub,
+        "data" / Bytes(this.n),
+        "inner" / Struct("m" / Int8ub, "x" / Computed(this.m * 2)),
+        "seq" / Sequence("k" / Int8ub, Bytes(this.k)),
+        "focus" / FocusedSeq("v", "k" / Int8ub, "v" / Bytes(this.k)),
+    )
+    c = d.compile()
+    assert c.source.count("this = result") == 2
+    assert c.source.count("this = {}") == 2
+    data = b"\x02ab\x05\x01z\x02xy"
+    assert c.parse(data) == d.parse(data)
+    assert c.parse(data).inner == Container(m=5, x=10)
+
+    d = Struct("n" / Int8ub, "inner" / Struct("data" / Bytes(this._.n)))
+    c = d.compile()
+    assert "this = result" not in c.source
+    assert c.parse(b"\x01a") == d.parse(b"\x01a")
+
+    d = Struct("n" / Int8ub, "data" / Bytes(lambda this: this.n))
+    c = d.compile(hybrid=True)
+    assert "this = result" not in c.source
+    assert c.parse(b"\x01a") == d.parse(b"\x01a")
+
+def test_compiled_lazy():
+    tlv = Struct("tag" / Byte, "children" / PrefixedArray(Byte, LazyBound(lambda: tlv)))
+    c = tlv.compile()
+    assert c.source.count("def parse_lazybound") == 1
+    assert all(r.kind == "sizeof" for r in c.report)
+    data = b"\x01\x02\x02\x00\x03\x01\x04\x00"
+    assert c.parse(data) == tlv.parse(data)
+    assert c.build(tlv.parse(data)) == data
+
+    d = Struct("n" / Int8ub, "fixed" / LazyArray(this.n, Int16ub), "varint" / LazyArray(2, VarInt))
+    c = d.compile()
+    assert [r.construct for r in c.report if r.kind == "parse"] == ["VarInt"]
+    data = b"\x02\x00\x01\x00\x02\x81\x01\x05"
+    obj = c.parse(data)
+    assert obj.fixed._offsets == range(1, 5, 2)
+    assert list(obj.fixed) == [1, 2]
+    assert list(obj.varint) == [129, 5]
+    assert c.build(dict(n=2, fixed=[1, 2], varint=[129, 5])) == data
+
+    d = LazyArray(3, Int16ub)
+    data = b"\x00\x01\x00\x02\x00\x03\xff\xff"
+    for obj in (d.parse(data), d.compile().parse(data)):
+        assert obj[-1] == 3
+        assert obj[-3] == 1
+        with pytest.raises(IndexError):
+            obj[-4]
+        with pytest.raises(IndexError):
+            obj[3]
+
+    d = LazyStruct("a" / Int8ub, "b" / VarInt, "c" / Bytes(2), "d" / Int16ub)
+    c = d.compile()
+    data = b"\x02\x81\x01ab\x00\x07"
+    obj = c.parse(data)
+    assert obj.d == 7
+    assert dict(obj.items()) == dict(d.parse(data).items()) == dict(a=2, b=129, c=b"ab", d=7)
+    assert c.build(dict(a=2, b=129, c=b"ab", d=7)) == data
+
+    # sizes that read the stream are read at the offset of their field
+    for d in [
+        LazyStruct("a" / Int8ub, Prefixed(Byte, GreedyBytes), "c" / Int8ub),
+        LazyStruct("a" / Int8ub, "b" / PascalString(Byte, "utf8"), "c" / Int8ub),
+    ]:
+        c = d.compile()
+        assert c.parse(b"\x07\x02hi\x09").c == d.parse(b"\x07\x02hi\x09").c == 9
+
+    d = Struct("x" / Lazy(Int16ub), "y" / Byte)
+    c = d.compile()
+    assert c.report == []
+    obj = c.parse(b"\x01\x02\x03")
+    assert obj.x() == 258 and obj.y == 3
+    assert c.build(dict(x=obj.x, y=3)) == b"\x01\x02\x03"
+
+
+def test_compiled_recordstruct():
+    d = RecordStruct("a" / Int8ub, "b" / Bytes(this.a), "inner" / RecordStruct("c" / Int16ub))
+    c = d.compile()
+    assert "record_" in c.source and "recordclass(('a', 'b', 'inner'))" in c.source
+    data = b"\x02ab\x00\x03"
+    obj = c.parse(data)
+    assert type(obj) is d.recordclass
+    assert type(obj.inner) is d.inner.recordclass
+    assert obj == d.parse(data) == Container(a=2, b=b"ab", inner=Container(c=3))
+    assert c.build(obj) == data
@@ -42,6 +42,179 @@ def test_bytes_issue_827():
     assert d.build(bytearray(b'\x01\x02\x03')) == b'\x01\x02\x03'
 
 
+def test_memoryviewio():
+    data = b"\x04beef\x05\x01\x00\x00\x00!\x02ab"
+    d = Struct(
+        "length" / Int8ub,
+        "data" / Bytes(this.length),
+        "box" / Prefixed(Int8ub, Struct(
+            "position" / Tell,
+            "value" / Int32ul,
+            "rest" / GreedyBytes,
+        )),
+        "name" / PascalString(Byte, "ascii"),
+    )
+    obj = d.parse_stream(MemoryviewIO(data))
+    assert obj == d.parse(data)
+    assert obj == Container(length=4, data=b"beef", box=Container(position=6, value=1, rest=b"!"), name=u"ab")
+    assert isinstance(obj.data, memoryview) and obj.data.obj is data
+    assert isinstance(obj.box.rest, memoryview) and obj.box.rest.obj is data
+    assert d.build(obj) == data
+
+    stream = MemoryviewIO(bytearray(b"0123456789"))
+    assert stream.read(2) == b"01"
+    assert stream.readview(3) == b"234"
+    assert stream.seek(-2, 2) == 8
+    assert stream.read() == b"89"
+    assert stream.read(1) == b""
+    assert stream.seek(20) == 20
+    assert stream.read() == b""
+    with pytest.raises(StreamError):
+        Bytes(5).parse_stream(MemoryviewIO(b"1234"))
+    with pytest.raises(StreamError):
+        Byte.build_stream(1, MemoryviewIO(bytes(1)))
+
+
+def test_build_into():
+    d = Struct("a" / Int16ub, "b" / Float32l, "c" / PascalString(Byte, "utf8"))
+    obj = dict(a=1, b=2.5, c=u"xyz")
+    data = d.build(obj)
+    buffer = bytearray(20)
+    assert d.build_into(obj, buffer, 2) == len(data)
+    assert buffer[2:2+len(data)] == data
+    assert buffer[:2] == bytes(2) and buffer[2+len(data):] == bytes(20-2-len(data))
+    assert d.compile().build_into(obj, memoryview(buffer)) == len(data)
+    assert buffer[:len(data)] == data
+    assert Struct("a" / Pointer(8, Byte), "b" / Byte).build_into(dict(a=1, b=2), buffer) == 9
+    with pytest.raises(StreamError):
+        d.build_into(obj, bytearray(4))
+    with pytest.raises(StreamError):
+        d.build_into(obj, bytearray(9))
+    with pytest.raises(StreamError):
+        d.build_into(obj, bytes(20))
+    with pytest.raises(FormatFieldError):
+        Int8ub.build_into(256, buffer)
+
+    d = Struct("t" / Tell, Check(this.t == 0), "a" / Pointer(2, Byte), "b" / Int16ub)
+    buffer = bytearray(b"\xff" * 10)
+    assert d.build_into(dict(a=1, b=2), buffer, 5) == 3
+    assert buffer == b"\xff" * 5 + b"\x00\x02\x01\xff\xff"
+    with pytest.raises(StreamError):
+        Struct("a" / Pointer(4, Byte)).build_into(dict(a=1), bytearray(8), 5)
+
+    # skipped bytes are zeroed, so a reused buffer holds the same bytes as build()
+    for d, obj in [
+        (Struct("a" / Byte, Seek(3), "b" / Byte), dict(a=1, b=2)),
+        (Struct("a" / Pointer(3, Byte), "b" / Byte), dict(a=1, b=2)),
+    ]:
+        buffer = bytearray(b"\xff" * 4)
+        assert d.build_into(obj, buffer) == 4
+        assert buffer == d.build(obj)
+    buffer = bytearray(b"\xff" * 6)
+    assert Struct("a" / Byte, Seek(3), "b" / Byte).build_into(dict(a=1, b=2), buffer, 1) == 4
+    assert buffer == b"\xff\x01\x00\x00\x02\xff"
+
+    with pytest.raises(ValueError):
+        Byte.build_into(1, bytearray(4), -4)
+    with pytest.raises(ValueError):
+        Byte.build_into(1, bytearray(4), 5)
+    assert Pass.build_into(None, bytearray(4), 4) == 0
+
+
+def test_build_chunks():
+    payload = b"x" * 1000
+    d = Prefixed(Int16ub, Prefixed(Int16ub, Struct("a" / Byte, "b" / FixedSized(4, GreedyBytes), "c" / Prefixed(Byte, GreedyBytes))))
+    obj = dict(a=1, b=b"ab", c=payload[:100])
+    chunks = d.build_chunks(obj)
+    assert b"".join(chunks) == d.build(obj)
+    assert payload[:100] in chunks
+
+    for d, obj in [
+        (Struct("a" / Pointer(8, Byte), "b" / Prefixed(Byte, GreedyBytes)), dict(a=1, b=b"abc")),
+        (Struct("a" / RawCopy(Byte), "b" / Byte), dict(a=dict(value=1), b=2)),
+        (Struct("a" / ByteSwapped(Int16ub), "b" / ProcessXor(0xf0, Bytes(2))), dict(a=1, b=b"ab")),
+        (Prefixed(Byte, Compressed(GreedyBytes, "zlib")), payload),
+        (Sequence(Bytes(4), Seek(1), Byte, Seek(8), Byte), [b"abcd", 1, 255, 8, 9]),
+    ]:
+        chunks = d.build_chunks(obj)
+        assert b"".join(chunks) == d.build(obj)
+        assert all(type(chunk) is bytes and chunk for chunk in chunks)
+
+    stream = ChunkedBytesIO()
+    assert stream.write(b"abc") == 3
+    assert stream.write(b"") == 0
+    assert stream.write(bytearray(b"def")) == 3
+    assert stream.chunks == [b"abc", b"def"]
+    assert stream.seek(1) == 1
+    assert stream.read(2) == b"bc"
+    assert stream.write(b"X") == 1
+    assert stream.getvalue() == b"abcXef"
+    assert stream.chunks == [b"abcXef"]
+    assert type(stream.chunks[0]) is bytes
+    assert len(stream) == 6
+    assert stream.seek(8) == 8
+    assert stream.write(b"") == 0
+    assert stream.getvalue() == b"abcXef"
+    assert stream.write(b"!") == 1
+    assert stream.getvalue() == b"abcXef\x00\x00!"
+
+
+def test_parse_async():
+    import asyncio
+    d = Struct(
+        "kind" / Enum(Int8ub, one=1, two=2),
+        "count" / VarInt,
+        "items" / Array(this.count, Int16ub),
+        "body" / Switch(this.kind, {
+            "one": Prefixed(Int8ub, Struct("x" / Int32ul, "rest" / GreedyBytes)),
+            "two": PascalString(Int8ub, "utf8"),
+        }),
+        "end" / Terminated,
+    )
+    obj = Container(kind="one", count=2, items=[1, 2], body=Container(x=7, rest=b"ab"), end=None)
+    data = d.build(obj)
+
+    class Writer:
+        def __init__(self):
+            self.data = b""
+        def write(self, data):
+            self.data += data
+        async def drain(self):
+            pass
+
+    async def parse(format, chunks):
+        reader = asyncio.StreamReader()
+        async def feed():
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                reader.feed_data(chunk)
+            reader.feed_eof()
+        task = asyncio.ensure_future(feed())
+        try:
+            return await format.parse_async(reader)
+        finally:
+            await task
+
+    def run(format, chunks):
+        return asyncio.run(parse(format, chunks))
+
+    assert run(d, [data[i:i+1] for i in range(len(data))]) == d.parse(data)
+    writer = Writer()
+    asyncio.run(d.build_async(obj, writer))
+    assert writer.data == data
+    assert run(Struct("a" / Int8ub, "b" / Bytes(2)), [b"\x01", b"ab"]) == Container(a=1, b=b"ab")
+    with pytest.raises(StreamError):
+        run(Int32ub, [b"\x01\x02"])
+    with pytest.raises(TerminatedError):
+        run(Sequence(Byte, Terminated), [b"\x01\x02"])
+    with pytest.raises(StreamError):
+        run(Struct("a" / Peek(Byte)), [b"\x01"])
+    with pytest.raises(StreamError):
+        run(Pointer(0, Byte), [b"\x01"])
+    with pytest.raises(StreamError):
+        run(GreedyBytes, [b"\x01"])
+
+
 def test_bitwise():
     common(Bitwise(Bytes(8)), b"\xff", b"\x01\x01\x01\x01\x01\x01\x01\x01", 1)
     common(Bitwise(Array(8, Bit)), b"\xff", [1, 1, 1, 1, 1, 1, 1, 1], 1)
@@ -589,6 +762,24 @@ def test_struct_issue_771():
     assert spec.sizeof(**info) == 10
     assert spec.sizeof(info) == 10  # should work either way
 
+def test_recordstruct():
+    common(RecordStruct(), b"", Container(), 0)
+    common(RecordStruct("a" / Int16ub, "b" / Int8ub), b"\x00\x01\x02", Container(a=1, b=2), 3)
+    common(RecordStruct("a" / RecordStruct("b" / Byte), Const(b"\x00")), b"\x01\x00", dict(a=dict(b=1)), 2)
+    d = RecordStruct("n" / Byte, "data" / Bytes(this.n), StopIf(this.n == 0), "tail" / Byte)
+    for format in (d, d.compile()):
+        obj = format.parse(b"\x02ab\x07")
+        assert type(obj) is d.recordclass
+        assert obj.data == obj["data"] == b"ab"
+        assert list(obj.keys()) == ["n", "data", "tail"]
+        assert format.build(obj) == b"\x02ab\x07"
+        obj = format.parse(b"\x00")
+        assert "tail" not in obj
+        assert obj == Container(n=0, data=b"")
+    assert RecordStruct("a" / Byte).recordclass is RecordStruct("a" / Int16ub).recordclass
+    with pytest.raises(ValueError):
+        RecordStruct("class" / Byte)
+
 def test_sequence():
     common(Sequence(), b"", [], 0)
     common(Sequence(Int8ub, Int16ub), b"\x01\x00\x02", [1, 2], 3)
@@ -1377,6 +1568,30 @@ def test_nullterminated():
     common(d, b"\x01\x00\x00\x02\x00\x00", b"\x01\x00\x00\x02", SizeofError)
 
 
+def test_nullterminated_chunked():
+    d = NullTerminated(GreedyBytes, term=bytes(2))
+    assert d.parse(b"a\x00\x00b\x00\x00") == b"a\x00\x00b"
+    assert NullTerminated(GreedyBytes, term=bytes(2), require=False).parse(b"ab\x00") == b"ab"
+    d = Struct("a" / NullTerminated(GreedyBytes, term=bytes(2), include=True), "b" / Tell)
+    assert d.parse(b"a\x00\x00\x00!!") == Container(a=b"a\x00\x00\x00", b=4)
+    d = Struct("a" / NullTerminated(GreedyBytes, consume=False), "b" / Tell)
+    assert d.parse(b"xyz\x00") == Container(a=b"xyz", b=3)
+    longstrings = [u"x" * n for n in (0, 1, 63, 64, 65, 300, 5000, 100000)]
+    d = CString("utf16")
+    assert d.parse(d.build(u"Āā")) == u"Āā"
+    d = GreedyRange(CString("utf8"))
+    assert d.parse(b"".join(s.encode() + b"\x00" for s in longstrings)) == longstrings
+    d = GreedyRange(CString("utf32"))
+    assert d.parse(d.build(longstrings)) == longstrings
+
+    class UnseekableStream(io.BytesIO):
+        def seekable(self):
+            return False
+    d = Sequence(CString("utf16"), Int8ub)
+    assert d.parse_stream(UnseekableStream(b"a\x00\x00\x00\x01")) == [u"a", 1]
+    assert d.parse_stream(MemoryviewIO(b"a\x00\x00\x00\x01")) == [u"a", 1]
+
+
 def test_nullstripped():
     d = NullStripped(GreedyBytes)
     common(d, b'\xff', b'\xff', SizeofError)
@@ -1716,6 +1931,52 @@ def test_rebuffered():
     assert Rebuffered(Byte).sizeof() == 1
     with pytest.raises(SizeofError):
         Rebuffered(VarInt).sizeof()
+    d = Rebuffered(Array(5, Byte), eoferror=True)
+    with pytest.raises(StreamError):
+        d.parse_stream(io.BytesIO(b"abc"))
+
+
+def test_incrementalparser():
+    p = IncrementalParser(Prefixed(Byte, GreedyBytes))
+    assert p.feed(b"\x03ab") == []
+    assert p.feed(b"c\x01d\x02") == [b"abc", b"d"]
+    assert p.feed(b"ef") == [b"ef"]
+    assert p.buffer == b""
+
+    p = IncrementalParser(Int16ub)
+    assert p.feed(b"\x01") == []
+    assert p.feed(b"\x02\x03\x04\x05") == [0x0102, 0x0304]
+    assert p.feed(b"\x06") == [0x0506]
+
+    p = IncrementalParser(CString("utf8"))
+    assert p.feed(b"ab") == []
+    assert p.feed(b"c\x00de\x00f") == [u"abc", u"de"]
+
+    attempts = []
+    d = Prefixed(Int32ub * (lambda obj,ctx: attempts.append(obj)), GreedyBytes)
+    data = d.build(bytes(10000))
+    p = IncrementalParser(d)
+    records = []
+    for i in range(len(data)):
+        records += p.feed(data[i:i+1])
+    assert records == [bytes(10000)]
+    assert len(attempts) == 2
+
+    p = IncrementalParser(Prefixed(Int32ub, GreedyBytes), maxbuffer=100)
+    assert p.feed(b"\x00\x00\x00\x10") == []
+    assert p.feed(bytes(16)) == [bytes(16)]
+    with pytest.raises(StreamError):
+        p.feed(b"\x00\x00\x10\x00")
+    with pytest.raises(StreamError):
+        IncrementalParser(Pass).feed(b"\x00")
+
+    p = IncrementalParser(Struct(Const(b"\xaa"), "x" / Byte))
+    with pytest.raises(ConstError) as e:
+        p.feed(b"\xaa\x01\xaa\x02\xbb\x03")
+    assert e.value.records == [Container(x=1), Container(x=2)]
+    assert p.buffer == b"\xbb\x03"
+    p.buffer.clear()
+    assert p.feed(b"\xaa\x04") == [Container(x=4)]
 
 
 def test_lazy():
@@ -2437,6 +2698,32 @@ def test_struct_stream():
     d.parse_stream(io.BytesIO(b'\x00' * 20))
 
 
+def test_struct_result_streams():
+    import gc
+    d = Struct("a" / Byte, "inner" / Struct("b" / Byte))
+    stream = io.BytesIO(b"\x01\x02")
+    assert d.parse_stream(stream)._io is stream
+    try:
+        setGlobalResultStreams(None)
+        obj = d.parse(b"\x01\x02")
+        assert "_io" not in obj and "_io" not in obj.inner
+        assert obj == Container(a=1, inner=Container(b=2))
+        assert NamedTuple("coord", "a b", Struct("a"/Byte, "b"/Byte)).parse(b"\x01\x02") == (1, 2)
+        setGlobalResultStreams("weak")
+        stream.seek(0)
+        obj = d.parse_stream(stream)
+        assert stream_tell(obj.inner._io, None) == 2
+        del stream
+        gc.collect()
+        with pytest.raises(ReferenceError):
+            obj._io.tell()
+        with pytest.raises(ValueError):
+            setGlobalResultStreams("soft")
+    finally:
+        setGlobalResultStreams()
+    assert "_io" in d.parse(b"\x01\x02")
+
+
 def test_struct_root_topmost():
     d = Struct(
         'x' / Computed(1),
@@ -2655,6 +2942,101 @@ def test_buildfile_issue_737():
     Byte.build_file(Byte.parse(b'\xff'), 'example_737')
     assert Byte.parse_file('example_737') == 255
 
+def test_parsefile_mmap(tmp_path):
+    filename = str(tmp_path / "example_mmap")
+    with open(filename, "wb") as f:
+        f.write(b"\x05\x06\x07\x08\x09\x02hi")
+    d = Struct(
+        "peek" / Peek(Int16ub),
+        "pointer" / Pointer(4, Byte),
+        "data" / Bytes(5),
+        "name" / PascalString(Byte, "ascii"),
+        Terminated,
+    )
+    assert d.parse_file(filename) == Container(peek=0x0506, pointer=9, data=b"\x05\x06\x07\x08\x09", name=u"hi")
+    with open(filename, "rb") as f:
+        f.seek(5)
+        stream = MmapIO.from_file(f)
+        assert stream.tell() == 5
+        assert PascalString(Byte, "ascii").parse_stream(stream) == u"hi"
+        assert stream.seek(-3, 2) == 5
+        with pytest.raises(StreamError):
+            Byte.build_stream(1, stream)
+        stream.close()
+
+    filename = str(tmp_path / "example_empty")
+    open(filename, "wb").close()
+    assert Terminated.parse_file(filename) is None
+    with pytest.raises(StreamError):
+        Byte.parse_file(filename)
+
+def test_windowio(tmp_path):
+    filename = str(tmp_path / "example_window")
+    with open(filename, "wb") as f:
+        f.write(b"\x07\x05\x03abc!!?")
+    d = Prefixed(Byte, Struct(
+        "inner" / Prefixed(Byte, Struct(
+            "position" / Tell,
+            "data" / Prefixed(Byte, GreedyBytes),
+            "rest" / GreedyBytes,
+        )),
+        "rest" / GreedyBytes,
+        "end" / Tell,
+    ))
+    obj = Container(inner=Container(position=2, data=b"abc", rest=b"!"), rest=b"!", end=8)
+    assert d.parse(b"\x07\x05\x03abc!!?") == obj
+    assert d.parse_file(filename) == obj
+    with open(filename, "wb") as f:
+        f.write(b"\x07\x05\x03abc!")
+    with pytest.raises(StreamError):
+        d.parse_file(filename)
+
+    stream = io.BytesIO(b"0123456789")
+    window = WindowIO(stream, 2, 5)
+    assert window.tell() == 2
+    assert window.read(2) == b"23"
+    assert window.read() == b"456"
+    assert window.read() == b""
+    assert window.seek(3) == 3
+    assert window.read(100) == b"3456"
+    assert stream.tell() == 0
+    nested = WindowIO(window, 3, 2)
+    assert nested.parent_stream is stream
+    assert nested.read() == b"34"
+    with pytest.raises(ValueError):
+        WindowIO(window, 6, 2)
+    assert Struct("a"/Bytes(2), "b"/Tell).parse_stream(WindowIO(stream, 4, 2)) == Container(a=b"45", b=6)
+    with pytest.raises(StreamError):
+        Bytes(3).parse_stream(WindowIO(stream, 4, 2))
+
+def test_parse_substreams_are_slices():
+    d = Prefixed(Byte, Struct("inner" / Prefixed(Byte, Struct("data" / GreedyBytes, "io" / Computed(this._io)))))
+    obj = d.parse(b"\x04\x03abc")
+    assert obj.inner.data == b"abc"
+    assert type(obj.inner.data) is bytes
+    assert type(obj.inner.io).__name__ == "_BytesIOView"
+    with pytest.raises(StreamError):
+        d.parse(b"\x04\x05abc")
+    stream = io.BytesIO(b"\x04\x03abc")
+    assert d.parse_stream(stream).inner.data == b"abc"
+    stream.write(b"def")
+    assert stream.getvalue() == b"\x04\x03abcdef"
+    # substreams slice the parsed bytes, the input is not copied
+    import tracemalloc
+    data = b"\x02hi" + bytes(10**7)
+    d = Struct("a" / Prefixed(Byte, Struct("b" / GreedyBytes, "io" / Computed(this._io))))
+    tracemalloc.start()
+    try:
+        obj = d.parse(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert obj.a.b == b"hi"
+    assert obj.a.io.buffer.obj is data
+    assert peak < 10**6
+    obj = d.parse(bytearray(b"\x02hi!"))
+    assert obj.a.b == b"hi"
+
 @xfail(reason="Context is not properly processed, see #771 and PR #784")
 def test_struct_issue_771():
     spec = Struct(